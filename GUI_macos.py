@@ -1,39 +1,83 @@
 import sys
+import threading
 from PyQt5 import QtWidgets, QtGui
-from PyQt5.QtWidgets import QTableView, QApplication, QMainWindow, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QFileDialog, QTreeView, QMessageBox, QCheckBox
-from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt 
-import pandas as pd
-from evaluation import run_instant_runoff
-
-class DataFrameModel(QAbstractTableModel):
-    def __init__(self, data=None):
-        super(DataFrameModel, self).__init__()
-        self.load_data(data)
-
-    def load_data(self, data):
-        self.data_frame = data if data is not None else pd.DataFrame()
-        self.column_count = len(self.data_frame.columns)
-        self.row_count = len(self.data_frame.index)
+from PyQt5.QtWidgets import QTableView, QApplication, QMainWindow, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QFileDialog, QTreeView, QMessageBox, QCheckBox, QProgressBar
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QThread, pyqtSignal
+from evaluation import run_instant_runoff, EvaluationCancelled, InputPreview
+
+class PreviewTableModel(QAbstractTableModel):
+    # Shows an InputPreview; more rows are read from the file when the view scrolls to the end
+    def __init__(self, preview=None):
+        super(PreviewTableModel, self).__init__()
+        self.preview = preview
+        self.headers = ['Voter-ID', 'Region1', 'Region2']
+        self.row_count = preview.row_count if preview is not None else 0
 
     def rowCount(self, parent=QModelIndex()):
         return self.row_count
 
     def columnCount(self, parent=QModelIndex()):
-        return self.column_count
+        return self.preview.column_count if self.preview is not None else 0
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return self.preview is not None and not self.preview.complete
+
+    def fetchMore(self, parent=QModelIndex()):
+        # Skip the page if the evaluation is currently reading the file on its worker thread
+        self.preview.fetch(blocking=False)
+        self.show_new_rows()
+
+    def show_new_rows(self):
+        # Inserts the rows the preview has read since the last call, e.g. by the evaluation on its worker thread
+        row_count = self.preview.row_count if self.preview is not None else 0
+        if row_count > self.row_count:
+            self.beginInsertRows(QModelIndex(), self.row_count, row_count - 1)
+            self.row_count = row_count
+            self.endInsertRows()
 
     def data(self, index, role=Qt.DisplayRole):
         if index.isValid() and role == Qt.DisplayRole:
-            return str(self.data_frame.iloc[index.row(), index.column()])
+            # The cells are stringified once per page, so painting is a plain array lookup
+            return self.preview.cell(index.row(), index.column())
         return None
 
     def headerData(self, section, orientation, role):
         if role == Qt.DisplayRole:
             if orientation == Qt.Horizontal:
-                return self.data_frame.columns[section]
+                return self.headers[section] if section < len(self.headers) else str(section)
             else:
-                return str(self.data_frame.index[section])
+                return str(section)
         return None
 
+class EvaluationWorker(QThread):
+    # Signals are delivered to the main thread, which is the only one allowed to touch the widgets
+    progress = pyqtSignal(str, float)
+    succeeded = pyqtSignal()
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_path, output_dir, consider_invalid, preview=None):
+        super().__init__()
+        self.file_path = file_path
+        self.output_dir = output_dir
+        self.consider_invalid = consider_invalid
+        self.preview = preview
+        self.cancel_event = threading.Event()
+
+    def report(self, phase, message, seconds, fraction):
+        self.progress.emit(f'{message} ({seconds:.2f} s)', fraction)
+
+    def run(self):
+        try:
+            # Reuse the rows the preview has already read instead of loading the file again
+            run_instant_runoff(self.file_path, self.output_dir, self.consider_invalid, use_cache=True,
+                               progress=self.report, cancel_event=self.cancel_event, preview=self.preview)
+            self.succeeded.emit()
+        except EvaluationCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -78,9 +122,26 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.table)
 
         # Button to run the Instant Runoff Voting process
-        run_button = QPushButton("Instant-Runoff Vote Evaluation", self)
-        run_button.clicked.connect(self.run_voting)
-        main_layout.addWidget(run_button)
+        self.run_button = QPushButton("Instant-Runoff Vote Evaluation", self)
+        self.run_button.clicked.connect(self.run_voting)
+        main_layout.addWidget(self.run_button)
+
+        # Progress bar, progress message and cancel button for running evaluations
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        progress_layout.addWidget(self.progress_bar)
+
+        self.cancel_button = QPushButton("Cancel", self)
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_voting)
+        progress_layout.addWidget(self.cancel_button)
+
+        main_layout.addLayout(progress_layout)
+        self.progress_label = QLabel("")
+        main_layout.addWidget(self.progress_label)
+        self.worker = None
+        self.preview = None
 
         # Set the layout for the central widget
         central_widget = QtWidgets.QWidget()
@@ -93,9 +154,10 @@ class MainWindow(QMainWindow):
             self.file_path_entry.setText(file_path)
             
             try:
-                # Attempt to read the Excel file without headers
-                df = pd.read_excel(file_path, header=None)
-                self.update_table(df.head())
+                # Only read the first page of the file; more pages are read while scrolling
+                self.preview = InputPreview(file_path)
+                self.update_table(self.preview)
+                df = self.preview.pages[0]
 
                 column_names = ['Voter-ID', 'Region1', 'Region2']
                 # Check if the number of column names matches the number of columns in the DataFrame
@@ -124,16 +186,9 @@ class MainWindow(QMainWindow):
             self.output_dir_entry.setText(dir_path)
             # Additional code for select_output_dir
 
-    def update_table(self, data):
-        # Set the new headers for the DataFrame
-        column_headers = ['Voter-ID', 'Region1', 'Region2']
-        try:
-            data.columns = column_headers
-        except:
-            pass
-
-        # Create the model with the updated DataFrame
-        model = DataFrameModel(data)
+    def update_table(self, preview):
+        # Create the model for the preview of the loaded file
+        model = PreviewTableModel(preview)
         self.table.setModel(model)
         #self.table.resizeColumnsToContents()
 
@@ -143,16 +198,52 @@ class MainWindow(QMainWindow):
         consider_invalid = self.consider_invalid_var.isChecked()  # Get the check state (True/False)
 
         if file_path and output_dir:
-            try:
-                # Adjust the function to accept the output directory as an argument
-                run_instant_runoff(file_path, output_dir, consider_invalid)
-                QMessageBox.information(self, "Success", "Voting assessment completed. Check the output files in the specified directory.")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", str(e))
+            # Run the evaluation on a worker thread so that the window stays responsive
+            # The preview is only reused if it still belongs to the selected file
+            preview = self.preview if self.preview is not None and self.preview.file_path == file_path else None
+            self.worker = EvaluationWorker(file_path, output_dir, consider_invalid, preview)
+            self.worker.progress.connect(self.show_progress)
+            self.worker.succeeded.connect(self.voting_succeeded)
+            self.worker.cancelled.connect(self.voting_cancelled)
+            self.worker.failed.connect(self.voting_failed)
+            self.run_button.setEnabled(False)
+            self.cancel_button.setEnabled(True)
+            self.progress_bar.setValue(0)
+            self.worker.start()
         else:
             QMessageBox.warning(self, "Warning", "Please select an Excel file and output directory first.")
 
-        # Your run_voting code here
+    def cancel_voting(self):
+        if self.worker is not None:
+            self.worker.cancel_event.set()
+            self.progress_label.setText("Cancelling...")
+
+    def show_progress(self, message, fraction):
+        self.progress_label.setText(message)
+        self.progress_bar.setValue(int(fraction * 100))
+
+    def finish_voting(self):
+        # Show the rows the evaluation has read from the previewed file
+        model = self.table.model()
+        if isinstance(model, PreviewTableModel):
+            model.show_new_rows()
+        self.run_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_label.setText("")
+
+    def voting_succeeded(self):
+        self.finish_voting()
+        self.progress_bar.setValue(100)
+        QMessageBox.information(self, "Success", "Voting assessment completed. Check the output files in the specified directory.")
+
+    def voting_cancelled(self):
+        self.finish_voting()
+        self.progress_bar.setValue(0)
+        QMessageBox.information(self, "Cancelled", "The voting assessment was cancelled.")
+
+    def voting_failed(self, message):
+        self.finish_voting()
+        QMessageBox.critical(self, "Error", message)
 
 # Your pandas DataFrame handling and other functions can be added here
 
@@ -1,7 +1,8 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import pandas as pd
-from evaluation import run_instant_runoff
+from evaluation import run_instant_runoff, EvaluationCancelled, InputPreview
 
 # Set up the main window
 root = tk.Tk()
@@ -20,9 +21,14 @@ style = ttk.Style(root)
 style.configure("Error.TLabel", foreground="red")
 style.configure("Good.TLabel", foreground="green")
 
+# Preview of the loaded file; its rows are reused by the evaluation
+preview = None
+shown_rows = 0  # Number of rows of the preview shown in the table
+
 
 # Function to open file dialog and load Excel file
 def load_excel():
+    global preview
     file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx;*.xls")])
     if file_path:
         file_path_entry.delete(0, tk.END)
@@ -31,16 +37,14 @@ def load_excel():
         # If all checks pass
         style.configure("Good.TLabel", foreground="green")
         try:
-            # Attempt to read the Excel file without headers
-            df = pd.read_excel(file_path, header=None)
-            update_table(df.head())
+            # Only read the first page of the file; more pages are read while scrolling
+            preview = InputPreview(file_path)
+            update_table()
+            df = preview.pages[0]
 
             column_names = ['Voter-ID', 'Region1', 'Region2']
             # Check if the number of column names matches the number of columns in the DataFrame
-            if len(column_names) == df.shape[1]:
-                # Assign new column names
-                df.columns = column_names
-            else:
+            if len(column_names) != df.shape[1]:
                 feedback_label.config(text="The Excel file should have exactly three columns (Voter-ID, Region 1, Region 2).", style="Error.TLabel",)
                 return
 
@@ -70,8 +74,10 @@ def select_output_dir():
         output_dir_entry.delete(0, tk.END)
         output_dir_entry.insert(0, dir_path)
 
-# Function to update the table with Excel data
-def update_table(data):
+# Function to update the table with the first page of the preview
+def update_table():
+    global shown_rows
+    shown_rows = 0
     for i in table.get_children():
         table.delete(i)
 
@@ -89,9 +95,33 @@ def update_table(data):
 
     for column in table["columns"]:
         table.heading(column, text=column)
-    df_rows = data.to_numpy().tolist()
-    for row in df_rows:
+    show_next_page()
+
+
+# Function to show the next page of the rows the preview has read, which the evaluation may have read
+# ahead; the table is not virtualized, so rows are only added page by page while scrolling
+def show_next_page():
+    global shown_rows
+    stop = min(shown_rows + preview.page_size, preview.row_count)
+    for row in preview.rows(shown_rows, stop):
         table.insert("", "end", values=row)
+    shown_rows = stop
+
+
+# Function to read and show the next page of the preview once the table is scrolled to its end
+def scroll_table(first, last):
+    table_scrollbar.set(first, last)
+    if preview is not None and float(last) > 0.9:
+        # Read a new page once all rows read so far are shown; skip it if the evaluation is currently
+        # reading the file on its worker thread
+        if shown_rows == preview.row_count and not preview.complete:
+            preview.fetch(blocking=False)
+        show_next_page()
+
+# State of the evaluation running in the background
+progress_queue = queue.Queue()
+cancel_event = threading.Event()
+
 
 # Function to run the Instant Runoff Voting process
 def run_voting():
@@ -99,16 +129,71 @@ def run_voting():
     output_dir = output_dir_entry.get()
     consider_invalid = consider_invalid_var.get()
     if file_path and output_dir:
-        try:
-            # Adjust the function to accept the output directory as an argument
-            run_instant_runoff(file_path,output_dir, consider_invalid)
-            messagebox.showinfo("Success", "Voting assessment completed. Check the output files in the specified directory.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        # Run the evaluation on a worker thread so that the window stays responsive
+        cancel_event.clear()
+        run_button.config(state=tk.DISABLED)
+        cancel_button.config(state=tk.NORMAL)
+        progress_bar['value'] = 0
+        # The preview is only reused if it still belongs to the selected file
+        file_preview = preview if preview is not None and preview.file_path == file_path else None
+        worker = threading.Thread(target=run_voting_worker, args=(file_path, output_dir, consider_invalid, file_preview),
+                                  daemon=True)
+        worker.start()
+        root.after(100, poll_progress)
     else:
         messagebox.showwarning("Warning", "Please select an Excel file and output directory first.")
 
 
+def run_voting_worker(file_path, output_dir, consider_invalid, file_preview):
+    # Runs on the worker thread; tkinter may only be used from the main thread, so all
+    # updates are passed on through the queue
+    def progress(phase, message, seconds, fraction):
+        progress_queue.put(('progress', f'{message} ({seconds:.2f} s)', fraction))
+
+    try:
+        # Reuse the rows the preview has already read instead of loading the file again
+        # Adjust the function to accept the output directory as an argument
+        run_instant_runoff(file_path,output_dir, consider_invalid, use_cache=True, progress=progress, cancel_event=cancel_event,
+                           preview=file_preview)
+        progress_queue.put(('done', None, 1))
+    except EvaluationCancelled:
+        progress_queue.put(('cancelled', None, 0))
+    except Exception as e:
+        progress_queue.put(('error', str(e), 0))
+
+
+def poll_progress():
+    while True:
+        try:
+            kind, message, fraction = progress_queue.get_nowait()
+        except queue.Empty:
+            root.after(100, poll_progress)
+            return
+
+        progress_bar['value'] = fraction * 100
+        if kind == 'progress':
+            progress_label.config(text=message)
+            continue
+
+        # The evaluation has finished
+        run_button.config(state=tk.NORMAL)
+        cancel_button.config(state=tk.DISABLED)
+        progress_label.config(text="")
+        if kind == 'done':
+            messagebox.showinfo("Success", "Voting assessment completed. Check the output files in the specified directory.")
+        elif kind == 'cancelled':
+            messagebox.showinfo("Cancelled", "The voting assessment was cancelled.")
+        else:
+            messagebox.showerror("Error", message)
+        return
+
+
+# Function to cancel a running evaluation
+def cancel_voting():
+    cancel_event.set()
+    progress_label.config(text="Cancelling...")
+
+
 
 # Entry for file path
 file_path_entry = ttk.Entry(frame1, width=40)
@@ -136,12 +221,25 @@ consider_invalid_check = ttk.Checkbutton(root, text="Consider invalid votes (vot
 consider_invalid_check.pack(pady=(0, 10))
 
 # Table to preview Excel data
-table = ttk.Treeview(root)
-table.pack(padx=10, pady=10, fill='x', expand=True)
+table_frame = ttk.Frame(root)
+table_frame.pack(padx=10, pady=10, fill='x', expand=True)
+table = ttk.Treeview(table_frame)
+table_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=table.yview)
+table.configure(yscrollcommand=scroll_table)
+table.pack(side=tk.LEFT, fill='x', expand=True)
+table_scrollbar.pack(side=tk.RIGHT, fill='y')
 
 # Button to run the Instant Runoff Voting process
 run_button = ttk.Button(root, text="Instant-Runoff Vote evaluation", command=run_voting)
 run_button.pack(pady=(0, 10))
 
+# Progress bar, progress message and cancel button for running evaluations
+progress_bar = ttk.Progressbar(root, mode='determinate', maximum=100)
+progress_bar.pack(padx=10, fill='x')
+progress_label = ttk.Label(root, text="")
+progress_label.pack(pady=(0, 10))
+cancel_button = ttk.Button(root, text="Cancel", command=cancel_voting, state=tk.DISABLED)
+cancel_button.pack(pady=(0, 10))
+
 # Run the application
 root.mainloop()
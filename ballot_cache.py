@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+
+# Bump whenever the parsing or encoding rules change, so that older cache entries are not reused
+CACHE_VERSION = 4
+
+# Default upper bound for the total size of a cache directory
+MAX_CACHE_BYTES = 256 * 1024 ** 2
+
+
+def file_hash(file_path):
+    """
+    Computes the SHA-256 content hash of a file.
+
+    Args:
+    file_path (str): Path to the file.
+
+    Returns:
+    str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def aliases_hash(aliases):
+    """
+    Computes a short hash of the alternative spellings of candidate names, which identifies them in keys.
+
+    Args:
+    aliases (dict): Maps alternative spellings onto canonical names.
+
+    Returns:
+    str: The first 16 hexadecimal digits of the SHA-256 digest.
+    """
+    return hashlib.sha256(json.dumps(aliases, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def cache_key(file_path, consider_invalid, aliases=None):
+    """
+    Builds the cache key for the encoded ballots of an input file.
+
+    Args:
+    file_path (str): Path to the Excel or CSV file containing voting data.
+    consider_invalid (bool): Flag to determine whether to consider invalid votes.
+    aliases (dict, optional): The alternative spellings of candidate names the ballots are encoded with.
+
+    Returns:
+    str: A key made of the content hash, the invalid-vote flag, a hash of the aliases and the cache version.
+    """
+    specifier = 'with_invalid' if consider_invalid else 'without_invalid'
+    key = f'{file_hash(file_path)}_{specifier}'
+    if aliases:
+        key += '_' + aliases_hash(aliases)
+    return f'{key}_v{CACHE_VERSION}'
+
+
+def load_cached_ballots(cache_dir, key):
+    """
+    Loads the encoded ballots of every region from the cache. The arrays are memory-mapped.
+
+    Args:
+    cache_dir (str): Directory holding the cache entries.
+    key (str): Cache key as returned by cache_key.
+
+    Returns:
+    dict: A dictionary mapping each region to a tuple of the distinct ballots, candidate names, total votes,
+          count of 'no good candidate' votes, count of invalid votes, ballot weights and the missing candidates
+          of the invalid votes with their weights, or None if there is no entry.
+    """
+    entry = os.path.join(cache_dir, key)
+    try:
+        with open(os.path.join(entry, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        regions = {}
+        for i, region in enumerate(meta['regions']):
+            ballots = np.load(os.path.join(entry, f'{i}.npy'), mmap_mode='r')
+            weights = np.load(os.path.join(entry, f'{i}_weights.npy'), mmap_mode='r')
+            missing = np.load(os.path.join(entry, f'{i}_missing.npy'), mmap_mode='r')
+            missing_weights = np.load(os.path.join(entry, f'{i}_missing_weights.npy'), mmap_mode='r')
+            regions[region['name']] = (ballots, region['candidates'], region['all_votes'],
+                                       region['no_good_candidate_count'], region['invalid_votes'], weights,
+                                       missing, missing_weights)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    # Mark the entry as recently used for the eviction policy
+    os.utime(entry)
+    return regions
+
+
+def store_cached_ballots(cache_dir, key, regions, max_bytes=MAX_CACHE_BYTES):
+    """
+    Stores the encoded ballots of every region in the cache and evicts old entries if needed.
+
+    Args:
+    cache_dir (str): Directory holding the cache entries.
+    key (str): Cache key as returned by cache_key.
+    regions (dict): A dictionary as returned by load_cached_ballots.
+    max_bytes (int): Upper bound for the total size of the cache directory.
+    """
+    entry = os.path.join(cache_dir, key)
+    partial = entry + '.partial'
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+
+    meta = {'regions': []}
+    for i, (region, (ballots, candidates, all_votes, no_good_candidate_count, invalid_votes, weights,
+                     missing, missing_weights)) in enumerate(regions.items()):
+        np.save(os.path.join(partial, f'{i}.npy'), np.asarray(ballots))
+        np.save(os.path.join(partial, f'{i}_weights.npy'), np.asarray(weights))
+        np.save(os.path.join(partial, f'{i}_missing.npy'), np.asarray(missing))
+        np.save(os.path.join(partial, f'{i}_missing_weights.npy'), np.asarray(missing_weights))
+        meta['regions'].append({
+            'name': region,
+            'candidates': list(candidates),
+            'all_votes': int(all_votes),
+            'no_good_candidate_count': int(no_good_candidate_count),
+            'invalid_votes': int(invalid_votes),
+        })
+    with open(os.path.join(partial, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    # Only expose complete entries
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(partial, entry)
+
+    evict_cache(cache_dir, max_bytes)
+
+
+def evict_cache(cache_dir, max_bytes=MAX_CACHE_BYTES):
+    """
+    Removes the least recently used cache entries until the cache directory fits into max_bytes.
+    The most recently used entry is always kept.
+
+    Args:
+    cache_dir (str): Directory holding the cache entries.
+    max_bytes (int): Upper bound for the total size of the cache directory.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if os.path.isdir(path) and not name.endswith('.partial'):
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), size, path))
+
+    # Newest first; drop everything after the size budget is used up
+    entries.sort(reverse=True)
+    total = 0
+    for i, (_, size, path) in enumerate(entries):
+        total += size
+        if i > 0 and total > max_bytes:
+            shutil.rmtree(path, ignore_errors=True)
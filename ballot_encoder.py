@@ -0,0 +1,124 @@
+import numpy as np
+from candidate_registry import CandidateRegistry
+from helper_functions import ballot_patterns, encode_choices, ranked_candidates
+
+
+class BallotEncoder:
+    """
+    Incrementally encodes chunks of raw ballot strings for one region into an integer ballot matrix
+    over a growing candidate index. Only the distinct encoded ballots of each chunk and their counts are
+    kept between chunks, so memory stays bounded by the number of distinct rankings rather than by the
+    number of voters.
+
+    The cleaning rules are the same as in clean_up_dataframe: ballots without any '[' count as
+    'no good candidate', as do ballots whose first choice starts with 'no good', and invalid votes
+    are the ballots that do not rank every candidate unless their last column is 'no good candidate'.
+
+    Args:
+    aliases (dict, optional): Alternative spellings of candidate names, see CandidateRegistry.
+    """
+
+    def __init__(self, aliases=None):
+        self.registry = CandidateRegistry(aliases)
+        self.blocks = []  # Distinct encoded ballots per chunk, each padded with -1
+        self.block_weights = []  # How often each distinct ballot of a chunk was cast
+        self.all_votes = 0
+        self.no_good_candidate_count = 0
+        self.combined = None  # Combined distinct ballots, weights, completeness mask and missing candidates
+
+    @property
+    def candidates(self):
+        """
+        list: The canonical candidate names indexed by their ID.
+        """
+        return self.registry.names
+
+    def add(self, raw_votes):
+        """
+        Parses and encodes one chunk of raw ballot strings.
+
+        Args:
+        raw_votes (pd.Series): The region column of a chunk as returned by read_input_chunks.
+        """
+        # Remove everything before the first '[' and count the empty rows as 'no good candidates'. A chunk
+        # in which a region is empty is read as float NaN, which the string methods do not accept.
+        processed = raw_votes.astype(object).str.extract(r'(\[.*$)', expand=False)
+        self.all_votes += len(processed)
+        self.no_good_candidate_count += int(processed.isna().sum())
+        processed = processed.dropna()
+        self.combined = None
+        if len(processed) == 0:
+            return
+
+        # Encode the choices, extending the candidate index with candidates not seen in earlier chunks
+        codes = encode_choices(processed, self.registry)
+
+        # Remove entries with 'no good candidate' in the first choice
+        first_no_good = self.registry.no_good()[codes[:, 0]]
+        self.no_good_candidate_count += int(first_no_good.sum())
+        patterns, weights, _ = ballot_patterns(codes[~first_no_good])
+        self.blocks.append(patterns)
+        self.block_weights.append(weights)
+
+    def encoded(self):
+        """
+        Combines the encoded chunks into the distinct ballots of all chunks and marks the complete ones.
+        The result is computed once and shared by both invalid-vote variants.
+
+        The combined distinct ballots replace the chunks, so chunks added later (e.g. by a live count, see
+        LiveElection) are merged into them at a cost that depends on the number of distinct ballots rather
+        than on the number of voters.
+
+        Returns:
+        tuple: A tuple containing the distinct counted ballots in order of first occurrence, how often
+               each was cast, a boolean mask that is False for invalid votes and a boolean matrix of shape
+               ballots x candidates that is True where a candidate is not ranked.
+        """
+        if self.combined is None:
+            width = max([block.shape[1] for block in self.blocks], default=0)
+            ballots = np.full((sum(len(block) for block in self.blocks), width), -1, dtype=np.int32)
+            row = 0
+            for block in self.blocks:
+                ballots[row:row + len(block), :block.shape[1]] = block
+                row += len(block)
+            weights = np.concatenate(self.block_weights or [np.zeros(0, dtype=np.int64)])
+            ballots, weights, _ = ballot_patterns(ballots, weights)
+            self.blocks = [ballots]
+            self.block_weights = [weights]
+
+            # The 'no good candidate' exemption only applies if the ballot fills the last column
+            lengths = (ballots >= 0).sum(axis=1)
+            last = ballots[np.arange(len(ballots)), np.maximum(lengths - 1, 0)] if width else np.zeros(0, dtype=int)
+            no_good = np.array([name.lower().startswith('no good candidate') for name in self.candidates] + [False])
+            exempt = no_good[last] & (lengths == width)
+
+            required = np.array(['no good candidate' not in name.lower() for name in self.candidates], dtype=bool)
+            missing = ~ranked_candidates(ballots, len(self.candidates)) & required
+            complete = exempt | ~missing.any(axis=1)
+            self.combined = ballots, weights, complete, missing
+        return self.combined
+
+    def finish(self, consider_invalid=False):
+        """
+        Applies the invalid-vote rule to the encoded ballots.
+
+        Args:
+        consider_invalid (bool): Flag to determine whether to consider invalid votes.
+
+        Returns:
+        tuple: A tuple containing the distinct ballots, the candidate names, total votes, count of
+               'no good candidate' votes, count of invalid votes, how often each distinct ballot was cast,
+               and for the distinct invalid votes (also if they are counted) a boolean matrix of shape
+               invalid votes x candidates that is True where a candidate is missing, and how often each
+               of them was cast.
+        """
+        ballots, weights, complete, missing = self.encoded()
+        missing, missing_weights = missing[~complete], weights[~complete]
+        invalid_votes = 0
+        if not consider_invalid:
+            invalid_votes = int(missing_weights.sum())
+            ballots = ballots[complete]
+            weights = weights[complete]
+
+        return (ballots, list(self.candidates), self.all_votes, self.no_good_candidate_count, invalid_votes, weights,
+                missing, missing_weights)
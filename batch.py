@@ -0,0 +1,249 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ballot_cache import file_hash
+from candidate_registry import load_aliases
+from evaluation import run_instant_runoff
+
+# Extensions of the input files picked up from directories
+INPUT_EXTENSIONS = ('.xlsx', '.csv')
+
+# Rows per chunk when streaming an input file
+CHUNK_SIZE = 10000
+
+# Name of the file in each job folder that records which input content it was evaluated from
+STATE_FILE = 'batch_state.json'
+
+
+def find_inputs(patterns, exclude=()):
+    """
+    Expands directories and glob patterns into a sorted list of input files. Patterns that match no
+    input file are reported.
+
+    Args:
+    patterns (list of str): Directories (all .xlsx and .csv files in them and their subdirectories are used),
+                            glob patterns ('**' matches any number of subdirectories) or file paths.
+    exclude (iterable of str): Directories that are not searched, e.g. the output directory of the batch.
+
+    Returns:
+    list: The input file paths, without Excel lock files ('~$...').
+    """
+    excluded = [os.path.normcase(os.path.abspath(path)) for path in exclude]
+
+    def is_excluded(path):
+        path = os.path.normcase(os.path.abspath(path))
+        return any(path == folder or path.startswith(folder + os.sep) for folder in excluded)
+
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = []
+            for folder, subfolders, names in os.walk(pattern):
+                subfolders[:] = [name for name in subfolders if not is_excluded(os.path.join(folder, name))]
+                matches.extend(os.path.join(folder, name) for name in names if name.lower().endswith(INPUT_EXTENSIONS))
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        matches = [path for path in matches if os.path.isfile(path) and not os.path.basename(path).startswith('~$')
+                   and not is_excluded(path)]
+        if not matches:
+            print(f'{pattern}: no input files found')
+        files.update(matches)
+    return sorted(files)
+
+
+def election_label(file_path, root):
+    """
+    Returns the name of an election: the path of its input file relative to the batch root, including the
+    extension, so that e.g. 2023/GN.xlsx, 2024/GN.xlsx and 2024/GN.csv are different elections.
+
+    Args:
+    file_path (str): Path to the input file.
+    root (str): The deepest directory containing all input files, see batch_root.
+
+    Returns:
+    str: The relative path with '/' as separator, e.g. '2023/GN.xlsx'.
+    """
+    return os.path.relpath(os.path.abspath(file_path), root).replace(os.sep, '/')
+
+
+def batch_root(files):
+    """
+    Returns the deepest directory that contains all input files.
+
+    Args:
+    files (list of str): The input file paths.
+    """
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files]) if files else os.getcwd()
+
+
+def job_folder(output_dir, election):
+    """
+    Returns the output folder of an election, which mirrors the path of its input file below the batch
+    root, e.g. 'batch_outputs/2023/GN.xlsx'.
+
+    Args:
+    output_dir (str): The directory holding the folders of all jobs.
+    election (str): The name of the election, see election_label.
+    """
+    return os.path.join(output_dir, *election.split('/'))
+
+
+def load_state(folder):
+    """
+    Reads the state recorded by an earlier run of a job.
+
+    Args:
+    folder (str): The output folder of the job.
+
+    Returns:
+    dict: The recorded input hash, options and summary rows, or None if there is no complete earlier run.
+    """
+    try:
+        with open(os.path.join(folder, STATE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def run_job(file_path, folder, election, consider_invalid, plots, input_hash, export='xlsx', aliases=None):
+    """
+    Evaluates one election into its own folder and records its state. Runs in a pool worker, which keeps
+    pandas and numpy imported between jobs.
+
+    Args:
+    file_path (str): Path to the input file.
+    folder (str): The output folder of the job.
+    election (str): The name of the election in the summary, see election_label.
+    consider_invalid (bool or str): Passed on to run_instant_runoff.
+    plots (str): Passed on to run_instant_runoff.
+    input_hash (str): Content hash of the input file.
+    export (str): Passed on to run_instant_runoff.
+    aliases (dict, optional): Passed on to run_instant_runoff.
+
+    Returns:
+    list of dicts: The summary rows of the election, one per region and invalid-vote variant.
+    """
+    os.makedirs(folder, exist_ok=True)
+    start = time.perf_counter()
+    # Streaming reads both Excel and CSV inputs and bounds the memory of each worker
+    summaries = run_instant_runoff(file_path, folder, consider_invalid, chunk_size=CHUNK_SIZE, plots=plots,
+                                   export=export, aliases=aliases)
+    election_seconds = time.perf_counter() - start
+
+    rows = [{'election': election, **summary, 'election seconds': election_seconds} for summary in summaries]
+
+    # Written last, so that an interrupted job is rerun
+    state = {'hash': input_hash, 'consider_invalid': consider_invalid, 'plots': plots, 'export': export,
+             'aliases': aliases, 'summary': rows}
+    with open(os.path.join(folder, STATE_FILE), 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    return rows
+
+
+def run_batch(patterns, output_dir, consider_invalid=True, plots='inline', workers=None, summary_format='csv',
+              force=False, export='xlsx', aliases=None):
+    """
+    Evaluates many elections in one shared process pool and writes a consolidated summary.
+
+    Inputs whose content hash and options match the state recorded by an earlier run are skipped,
+    and the summary rows of that run are reused. Each election is named after the path of its input
+    file relative to the deepest directory containing all inputs, see election_label.
+
+    Args:
+    patterns (list of str): Directories, glob patterns or file paths of the input files, see find_inputs.
+    output_dir (str): Directory in which each election gets its own folder, next to the summary.
+    consider_invalid (bool or str): Passed on to run_instant_runoff.
+    plots (str): Passed on to run_instant_runoff ('inline' or 'none').
+    workers (int, optional): Number of worker processes; defaults to the number of CPUs.
+    summary_format (str): 'csv' or 'parquet' (needs pyarrow or fastparquet).
+    force (bool): Flag to rerun every input, even if it has not changed.
+    export (str): Passed on to run_instant_runoff, e.g. 'workbook' for one results file per election.
+    aliases (dict, optional): Alternative spellings of candidate names, see CandidateRegistry.
+
+    Returns:
+    df: The summary with one row per election, region and invalid-vote variant.
+    """
+    import pandas as pd
+
+    if summary_format not in ('csv', 'parquet'):
+        raise ValueError(f"Unknown summary format '{summary_format}', expected 'csv' or 'parquet'.")
+
+    # The outputs are left out, in case the output directory is below an input directory
+    files = find_inputs(patterns, exclude=[output_dir])
+    if not files:
+        raise ValueError('No input files match ' + ', '.join(patterns))
+    os.makedirs(output_dir, exist_ok=True)
+    root = batch_root(files)
+    elections = {file_path: election_label(file_path, root) for file_path in files}
+
+    # Fail before any job runs if two inputs would share a folder, e.g. on a case-insensitive file system
+    folders = {}
+    for file_path, election in elections.items():
+        folders.setdefault(os.path.normcase(job_folder(output_dir, election)).casefold(), []).append(file_path)
+    duplicates = [paths for paths in folders.values() if len(paths) > 1]
+    if duplicates:
+        raise ValueError('Inputs with the same output folder: ' + '; '.join(', '.join(paths) for paths in duplicates))
+
+    rows = []
+    errors = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for file_path, election in elections.items():
+            folder = job_folder(output_dir, election)
+            input_hash = file_hash(file_path)
+            state = load_state(folder)
+            if (not force and state is not None and state['hash'] == input_hash
+                    and state['consider_invalid'] == consider_invalid and state['plots'] == plots
+                    and state.get('export', 'xlsx') == export and state.get('aliases') == aliases):
+                print(f'{file_path}: unchanged, skipped')
+                rows.extend(state['summary'])
+                continue
+            futures[pool.submit(run_job, file_path, folder, election, consider_invalid, plots, input_hash,
+                                export, aliases)] = file_path
+
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                rows.extend(future.result())
+                print(f'{file_path}: done')
+            except Exception as e:
+                errors[file_path] = e
+                print(f'{file_path}: failed ({e})')
+
+    summary = pd.DataFrame(rows, columns=['election', 'region', 'variant', 'method', 'winner', 'rounds',
+                                          'valid votes', 'no good candidates', 'invalid votes', 'seconds',
+                                          'election seconds'])
+    summary = summary.sort_values(['election', 'variant', 'region'], ignore_index=True)
+    if summary_format == 'csv':
+        summary.to_csv(os.path.join(output_dir, 'summary.csv'), index=False)
+    else:
+        summary.to_parquet(os.path.join(output_dir, 'summary.parquet'), index=False)
+
+    if errors:
+        raise RuntimeError('Evaluation failed for ' + '; '.join(f'{path}: {error}' for path, error in errors.items()))
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Evaluate many elections with Instant-Runoff Voting.')
+    parser.add_argument('inputs', nargs='+', help='directories, glob patterns or files of the elections')
+    parser.add_argument('--output', default='batch_outputs', help='directory for the outputs and the summary')
+    parser.add_argument('--invalid', choices=['with', 'without', 'both'], default='with',
+                        help='whether to count the invalid votes, or evaluate both variants')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--summary-format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--export', choices=['xlsx', 'workbook', 'csv', 'parquet'], default='xlsx',
+                        help='format of the result tables')
+    parser.add_argument('--aliases', metavar='JSON_FILE',
+                        help='JSON object mapping alternative spellings of candidate names onto their canonical name')
+    parser.add_argument('--no-plots', action='store_true', help='skip rendering the charts')
+    parser.add_argument('--force', action='store_true', help='rerun inputs even if they have not changed')
+    args = parser.parse_args()
+
+    consider_invalid = {'with': True, 'without': False, 'both': 'both'}[args.invalid]
+    run_batch(args.inputs, args.output, consider_invalid, plots='none' if args.no_plots else 'inline',
+              workers=args.workers, summary_format=args.summary_format, force=args.force,
+              export=args.export, aliases=load_aliases(args.aliases))
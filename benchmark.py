@@ -0,0 +1,131 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from synthetic_election import generate_election, write_election
+
+# Numbers of ballots the stages are timed at by default
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+
+def election_file(data_dir, n_voters, seed=0):
+    """
+    Returns the path of a synthetic election workbook, generating it on first use.
+
+    Args:
+    data_dir (str): Directory in which the generated workbooks are kept between runs.
+    n_voters (int): Number of voters.
+    seed (int): Seed of the generated election.
+    """
+    path = os.path.join(data_dir, f'election_{n_voters}_{seed}.xlsx')
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        write_election(generate_election(n_voters, seed=seed), path + '.partial.xlsx')
+        os.replace(path + '.partial.xlsx', path)
+    return path
+
+
+def time_call(function, *args, repeats=1):
+    """
+    Calls a function repeatedly and measures the fastest wall time.
+
+    Returns:
+    tuple: A tuple containing the fastest wall time in seconds and the result of the last call.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        # Keep the output of the timed stages out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def benchmark_size(path, repeats=1):
+    """
+    Times the read, clean, tally, pipeline and plot stages on one election workbook.
+
+    Args:
+    path (str): Path to the election workbook.
+    repeats (int): Number of runs per stage; the fastest one is reported.
+
+    Returns:
+    dict: The wall time in seconds of each stage.
+    """
+    from evaluation import clean_up_dataframe, input_excel, instant_runoff_voting, run_instant_runoff
+    from plotting import plot_instant_runoff_results, plot_test_eligibility
+
+    timings = {}
+    timings['read'], input_df = time_call(input_excel, path, repeats=repeats)
+    timings['clean'], (clean_votes, *_) = time_call(lambda: clean_up_dataframe(input_df[['Voter-ID', 'Region 2']].copy()),
+                                                    repeats=repeats)
+    timings['tally'], (_, rounds, _) = time_call(instant_runoff_voting, clean_votes, repeats=repeats)
+
+    store_path = tempfile.mkdtemp()
+    try:
+        timings['pipeline'], _ = time_call(lambda: run_instant_runoff(path, store_path, plots='none'), repeats=repeats)
+        vote_dict = {'valid votes': len(clean_votes), 'no good candidates': 1, 'invalid votes': 1}
+        timings['plot'], _ = time_call(lambda: (plot_test_eligibility(vote_dict, store_path, 'Region 2', 'bench'),
+                                                plot_instant_runoff_results(rounds, store_path, 'Region 2', 'bench')),
+                                       repeats=repeats)
+    finally:
+        shutil.rmtree(store_path, ignore_errors=True)
+    return timings
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Compares the timings of a run with the timings of an earlier run.
+
+    Args:
+    results (dict): Timings per size and stage of this run.
+    baseline (dict): Timings per size and stage of the earlier run.
+    tolerance (float): Allowed relative slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+    list of str: A description of every stage that got slower than allowed.
+    """
+    regressions = []
+    for size, stages in results.items():
+        for stage, seconds in stages.items():
+            before = baseline.get(size, {}).get(stage)
+            if before is not None and seconds > before * (1 + tolerance):
+                regressions.append(f'{stage} at {size} ballots: {before:.3f} s -> {seconds:.3f} s')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time each evaluation stage on synthetic elections.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='numbers of ballots')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'youngo_benchmark'),
+                        help='directory for the generated workbooks, which are reused between runs')
+    parser.add_argument('--save', help='write the timings to this JSON file, e.g. to use it as a baseline')
+    parser.add_argument('--baseline', help='JSON file of an earlier run to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        # Large elections are only timed once
+        repeats = args.repeats if size <= 100000 else 1
+        results[str(size)] = benchmark_size(election_file(args.data_dir, size), repeats)
+        print(f'{size:>8d} ballots  ' + '  '.join(f'{stage} {seconds:7.3f} s'
+                                                  for stage, seconds in results[str(size)].items()))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f'SLOWER: {regression}')
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,127 @@
+import json
+import re
+import sys
+import numpy as np
+
+# The letter prefix of a choice, e.g. '[A] '
+PREFIX = re.compile(r'^\s*\[[^\]]*\]\s*')
+
+# Choices that are always written in lowercase, whatever their spelling on the ballot
+LOWERCASE_NAMES = ('no good candidate',)
+
+
+def is_no_good(name):
+    """
+    Checks whether a candidate name is the 'no good candidate' option rather than a real candidate.
+
+    Args:
+    name (str): A canonical candidate name.
+
+    Returns:
+    bool: True if the name starts with 'no good' (e.g. 'no good candidate').
+    """
+    return name.casefold().startswith('no good')
+
+
+def load_aliases(file_path):
+    """
+    Reads the alternative spellings of candidate names from a JSON file, as given with --aliases.
+
+    Args:
+    file_path (str, optional): Path to a JSON object mapping alternative spellings onto canonical names.
+
+    Returns:
+    dict: The aliases, or None if no file is given.
+    """
+    if not file_path:
+        return None
+    with open(file_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def candidate_key(spelling):
+    """
+    Reduces a spelling of a choice to the key that identifies its candidate: without the letter prefix,
+    with single spaces and case-folded.
+
+    Args:
+    spelling (str): A choice as it appears on a ballot, e.g. '[A]  Jane Doe'.
+
+    Returns:
+    str: The key, e.g. 'jane doe'.
+    """
+    return ' '.join(PREFIX.sub('', spelling).split()).casefold()
+
+
+class CandidateRegistry:
+    """
+    Maps every spelling of a choice onto a canonical candidate name and a small integer ID, built up once
+    per region while its ballots are read. Spellings that only differ in their letter prefix, case or
+    whitespace, and the configured aliases, are the same candidate. Each distinct spelling is normalised
+    only once; the cells of later chunks are looked up by their spelling.
+
+    The canonical name of a candidate is its first spelling without the prefix and extra whitespace, or
+    the target of an alias. 'no good candidate' is always written in lowercase.
+
+    Args:
+    aliases (dict, optional): Maps alternative spellings onto the canonical name of their candidate,
+                              e.g. {'Jon Doe': 'John Doe'}. Both sides are matched like candidate_key.
+
+    Attributes:
+    names (list): The interned canonical names indexed by candidate ID.
+    """
+
+    def __init__(self, aliases=None):
+        self.names = []
+        self.ids = {}  # Candidate key -> ID
+        self.spellings = {}  # Spelling as on the ballot -> ID
+        self.aliases = {candidate_key(alias): ' '.join(PREFIX.sub('', name).split())
+                        for alias, name in (aliases or {}).items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def register(self, spelling):
+        """
+        Returns the ID of the candidate of a spelling, registering the candidate if it is new.
+
+        Args:
+        spelling (str): A choice as it appears on a ballot.
+
+        Returns:
+        int: The candidate ID.
+        """
+        candidate = self.spellings.get(spelling)
+        if candidate is None:
+            key = candidate_key(spelling)
+            name = self.aliases.get(key)
+            if name is None:
+                name = key if key in LOWERCASE_NAMES else ' '.join(PREFIX.sub('', spelling).split())
+            key = candidate_key(name)
+            candidate = self.ids.get(key)
+            if candidate is None:
+                candidate = self.ids[key] = len(self.names)
+                self.names.append(sys.intern(key if key in LOWERCASE_NAMES else name))
+            self.spellings[spelling] = candidate
+        return candidate
+
+    def encode(self, spellings):
+        """
+        Maps distinct spellings onto candidate IDs.
+
+        Args:
+        spellings (iterable of str): Distinct spellings, e.g. from pd.factorize.
+
+        Returns:
+        np.ndarray: The candidate ID of each spelling.
+        """
+        return np.array([self.register(spelling) for spelling in spellings], dtype=np.int32)
+
+    def no_good(self):
+        """
+        Marks the candidate IDs whose name starts with 'no good' (e.g. 'no good candidate').
+
+        Returns:
+        np.ndarray: A boolean array over the candidate IDs.
+        """
+        return np.array([is_no_good(name) for name in self.names], dtype=bool)
@@ -1,19 +1,62 @@
 import os
-from helper_functions import split_and_rename, remove_first_four_chars, contains_all_elements, shift_choices, conditional_lowercase
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
 import re
 import math
+import bisect
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
+# pandas, numpy, openpyxl and matplotlib are imported inside the functions that need them, so that
+# importing this module (e.g. when a GUI starts) stays fast.
 
 
-# Permanently changes the pandas settings
-pd.set_option('display.max_rows', None)
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', None)
-# pd.set_option('display.max_colwidth', -1)
+class EvaluationCancelled(Exception):
+    """
+    Raised when a running evaluation is cancelled through its cancel event.
+    """
+
+
+class ProgressReporter:
+    """
+    Forwards progress events of an evaluation to a callback and checks for cancellation.
+
+    The callback is called as callback(phase, message, seconds, fraction), where phase is one of
+    'parse', 'clean', 'round', 'save' and 'plot', seconds is the time spent since the previous event
+    (i.e. the duration of the step that just finished) and fraction is the share of the evaluation
+    completed so far.
+
+    Args:
+    callback (callable, optional): The function receiving the progress events.
+    cancel_event (threading.Event, optional): Once set, the next event raises EvaluationCancelled.
+    """
 
+    def __init__(self, callback=None, cancel_event=None):
+        self.callback = callback
+        self.cancel_event = cancel_event
+        self.total_steps = 1
+        self.completed_steps = 0
+        self.last_event = time.perf_counter()
+
+    def __call__(self, phase, message):
+        now = time.perf_counter()
+        seconds, self.last_event = now - self.last_event, now
+
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise EvaluationCancelled('The evaluation was cancelled.')
+        if self.callback is not None:
+            self.callback(phase, message, seconds, self.completed_steps / self.total_steps)
+
+
+def set_pandas_display_options():
+    """
+    Permanently changes the pandas settings so that printed DataFrames are shown in full.
+    """
+    import pandas as pd
+
+    pd.set_option('display.max_rows', None)
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.width', None)
+    # pd.set_option('display.max_colwidth', -1)
 
 
 def input_excel(file_path):
@@ -27,6 +70,8 @@ def input_excel(file_path):
     Returns:
     df: A dataframe with three columns ('Voter-ID', 'Region 1' and 'Region 2').
     """
+    import pandas as pd
+
     # Load the Excel file without headers
     df = pd.read_excel(file_path, header=None)
 
@@ -66,7 +111,228 @@ def input_excel(file_path):
     # }
     return df
 
-def clean_up_dataframe(df, consider_invalid=False):
+def read_input_chunks(file_path, chunk_size=10000):
+    """
+    Reads an Excel or CSV file of votes in chunks of at most chunk_size rows, so that the whole file
+    never has to be held in memory. Excel files are read with openpyxl in read-only mode.
+
+    Merged Voter-ID cells are forward-filled across chunk boundaries.
+
+    Args:
+    file_path (str): The file path of the Excel (.xlsx) or CSV (.csv) file to be processed.
+    chunk_size (int): Maximum number of rows per chunk.
+
+    Yields:
+    df: Dataframes with the same columns as returned by input_excel.
+    """
+    import numpy as np
+    import pandas as pd
+
+    column_names = ['Voter-ID', 'Region 1', 'Region 2']
+
+    if file_path.lower().endswith('.csv'):
+        chunks = pd.read_csv(file_path, header=None, chunksize=chunk_size)
+    else:
+        chunks = excel_chunks(file_path, chunk_size)
+
+    last_voter_id = np.nan
+    for chunk in chunks:
+        # Check if the number of column names matches the number of columns in the DataFrame
+        if len(column_names) == chunk.shape[1]:
+            chunk.columns = column_names
+
+        # Fill merged Voter-ID cells with the last Voter-ID above them, which for the first rows
+        # of a chunk is the last Voter-ID of the previous chunk
+        voter_ids = chunk.iloc[:, 0].to_numpy(dtype=object)
+        source = np.maximum.accumulate(np.where(pd.isna(voter_ids), -1, np.arange(len(voter_ids))))
+        voter_ids = np.where(source >= 0, voter_ids[source], last_voter_id)
+        chunk[chunk.columns[0]] = pd.Series(voter_ids, index=chunk.index).infer_objects()
+        last_voter_id = voter_ids[-1]
+        yield chunk
+
+
+def excel_chunks(file_path, chunk_size):
+    """
+    Yields the rows of the first worksheet of an Excel file as dataframes of at most chunk_size rows.
+    Empty rows are only kept if a non-empty row follows, matching pd.read_excel.
+
+    Args:
+    file_path (str): The file path of the Excel file to be processed.
+    chunk_size (int): Maximum number of rows per chunk.
+    """
+    import openpyxl
+    import pandas as pd
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows, empty_rows, start = [], [], 0
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            if all(value is None for value in row):
+                empty_rows.append(row)
+                continue
+            rows.extend(empty_rows)
+            empty_rows = []
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield pd.DataFrame(rows[:chunk_size], index=range(start, start + chunk_size))
+                rows, start = rows[chunk_size:], start + chunk_size
+        if rows:
+            yield pd.DataFrame(rows, index=range(start, start + len(rows)))
+    finally:
+        workbook.close()
+
+
+def encode_input_chunks(file_path, chunk_size=10000, aliases=None):
+    """
+    Streams an input file and encodes the ballots of every region chunk by chunk.
+
+    Args:
+    file_path (str): The file path of the Excel (.xlsx) or CSV (.csv) file to be processed.
+    chunk_size (int): Maximum number of rows held in memory as strings at once.
+    aliases (dict, optional): Alternative spellings of candidate names, see CandidateRegistry.
+
+    Returns:
+    dict: A dictionary mapping each region name to its BallotEncoder.
+    """
+    from ballot_encoder import BallotEncoder
+
+    encoders = {}
+    for chunk in read_input_chunks(file_path, chunk_size):
+        for region in chunk.columns[1:]:
+            encoders.setdefault(region, BallotEncoder(aliases)).add(chunk[region])
+    return encoders
+
+
+class InputPreview:
+    """
+    Reads an input file page by page for previewing it, e.g. in a GUI table that fetches more rows while
+    scrolling. Only the pages that were asked for are read; the rows read so far are kept, so that the
+    evaluation can take the whole frame from the preview instead of reading the file a second time.
+
+    The rows are kept per page, so reading a page never copies the pages before it. A page is only
+    stringified for display once it is shown; pages read for an evaluation are not.
+
+    Args:
+    file_path (str): The file path of the Excel (.xlsx) or CSV (.csv) file to be previewed.
+    page_size (int): Number of rows read per page.
+    """
+
+    def __init__(self, file_path, page_size=1000):
+        self.file_path = file_path
+        self.page_size = page_size
+        self.stat = file_stat(file_path)  # Modification time and size of the file the rows are read from
+        self.pages = []  # Dataframes of the rows read so far
+        self.page_cells = []  # The rows of each page as strings once they are displayed, else None
+        self.page_starts = []  # Index of the first row of each page
+        self.row_count = 0
+        self.complete = False
+        self.lock = threading.Lock()  # The evaluation may read the remaining rows from another thread
+        self.chunks = read_input_chunks(file_path, page_size)
+        self.fetch()
+
+    @property
+    def column_count(self):
+        return self.pages[0].shape[1] if self.pages else 0
+
+    @property
+    def columns(self):
+        return list(self.pages[0].columns) if self.pages else []
+
+    def is_current(self):
+        """
+        Checks whether the file is unchanged since the preview was opened, so that its rows can be reused.
+        """
+        try:
+            return file_stat(self.file_path) == self.stat
+        except OSError:
+            return False
+
+    def page_text(self, page):
+        """
+        Returns the cells of a page as strings, stringifying the page the first time it is displayed.
+        """
+        cells = self.page_cells[page]
+        if cells is None:
+            cells = self.page_cells[page] = self.pages[page].astype(str).to_numpy(dtype=object)
+        return cells
+
+    def cell(self, row, column):
+        """
+        Returns the displayed text of a cell of the rows read so far.
+        """
+        page = bisect.bisect_right(self.page_starts, row) - 1
+        return self.page_text(page)[row - self.page_starts[page], column]
+
+    def rows(self, start, stop):
+        """
+        Returns the displayed text of the rows start to stop (exclusive) of the rows read so far.
+
+        Returns:
+        list of lists: One list of cells per row.
+        """
+        rows = []
+        first = max(bisect.bisect_right(self.page_starts, start) - 1, 0)
+        for page in range(first, len(self.page_starts)):
+            page_start = self.page_starts[page]
+            if page_start >= stop:
+                break
+            rows.extend(self.page_text(page)[max(start - page_start, 0):stop - page_start].tolist())
+        return rows
+
+    def fetch(self, blocking=True):
+        """
+        Reads the next page of rows.
+
+        Args:
+        blocking (bool): If False and another thread is reading the file, return immediately.
+
+        Returns:
+        int: The number of rows added, 0 once the whole file is read.
+        """
+        if not self.lock.acquire(blocking):
+            return 0
+        try:
+            page = next(self.chunks, None) if not self.complete else None
+            if page is None:
+                self.complete = True
+                return 0
+            self.pages.append(page)
+            self.page_cells.append(None)
+            self.page_starts.append(self.row_count)
+            # Counted last, so that another thread never sees rows without their page
+            self.row_count += len(page)
+            return len(page)
+        finally:
+            self.lock.release()
+
+    def frame(self, report=None):
+        """
+        Reads the remaining rows and returns the whole file.
+
+        Args:
+        report (ProgressReporter, optional): Receives a 'parse' event after every page, which also
+                                             raises EvaluationCancelled once the evaluation is cancelled.
+
+        Returns:
+        df: A dataframe with the same columns as returned by input_excel.
+        """
+        import pandas as pd
+
+        while self.fetch():
+            if report is not None:
+                report('parse', f'Read {self.row_count} rows of {os.path.basename(self.file_path)}')
+        return pd.concat(self.pages)
+
+
+def file_stat(file_path):
+    """
+    Returns the modification time and size of a file, which change whenever the file is saved again.
+    """
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def clean_up_dataframe(df, consider_invalid=False, return_missing=False):
     """
     Cleans up the DataFrame by processing voting data, removing certain entries,
     and optionally considering invalid votes.
@@ -74,37 +340,30 @@ def clean_up_dataframe(df, consider_invalid=False):
     Args:
     df (pd.DataFrame): DataFrame containing the voting data.
     consider_invalid (bool): Flag to determine whether to consider invalid votes.
+    return_missing (bool): Flag to additionally return which candidates each removed invalid vote is missing.
 
     Returns:
     tuple: A tuple containing the cleaned DataFrame, total votes, count of 'no good candidate' votes,
-           and count of invalid votes.
+           and count of invalid votes. If return_missing is set, a boolean DataFrame with one row per
+           removed invalid vote and one column per candidate (True if missing) is appended.
     """
+    import pandas as pd
+    from helper_functions import parse_ballots, complete_ballots
+
 
     # Step 1: Remove everything before the first '[' in column 1
-    df['Processed'] = df.iloc[:, 1].str.extract(r'(\[.*$)')
+    df['Processed'] = df.iloc[:, 1].astype(object).str.extract(r'(\[.*$)')
     all_votes = len(df['Processed'])
 
     # Step 2: Remove empty rows (rows representing 'no good candidates')
     no_good_candidate_count = df['Processed'].isna().sum()
     df = df.dropna(subset=['Processed'])
 
-    # Step 3: Split the column with '>' and rename the columns
-    split_df = df['Processed'].apply(split_and_rename)
-
-    # Step 4: Remove the first four characters (the letters) from each cell
-    split_df = split_df.apply(remove_first_four_chars)
-
-    # List of strings to convert to lowercase
-    strings_to_lowercase = ['no good candidate']
+    # Step 3 and 4: Split the column with '>', remove the letters and lowercase 'no good candidate'
+    split_df = parse_ballots(df['Processed'])
 
-    # Apply the function to each column in the dataframe
-    for col in split_df.columns:
-        split_df[col] = split_df[col].apply(lambda row: conditional_lowercase(row, strings_to_lowercase))
-    # print(split_df)
-
-    # Step 5: Get all candidate names by concatenating values and finding unique ones
-    all_values = pd.concat([split_df[col] for col in split_df.columns])
-    all_names = all_values.unique().tolist()
+    # Step 5: Get all candidate names by finding the unique values
+    all_names = pd.unique(split_df.to_numpy().ravel()).tolist()
 
     # Filter out 'no good candidate' entries and NaN values
     only_candidate_names = [item for item in all_names if
@@ -122,7 +381,9 @@ def clean_up_dataframe(df, consider_invalid=False):
         initial_row_count = len(final_df)
 
         # Drop rows that do not contain all candidate names
-        final_df = final_df[final_df.apply(lambda row: contains_all_elements(row, only_candidate_names), axis=1)]
+        complete, missing = complete_ballots(final_df[split_df.columns], only_candidate_names)
+        missing = missing[~complete]
+        final_df = final_df[complete]
 
         # Calculate the number of invalid votes dropped
         invalid_votes = initial_row_count - len(final_df)
@@ -130,201 +391,582 @@ def clean_up_dataframe(df, consider_invalid=False):
         # final_df.fillna('no good candidate', inplace=True)
 
         invalid_votes = 0
+        missing = pd.DataFrame(columns=only_candidate_names, dtype=bool)
 
     # Step 8: streamline use of no good candidate
 
 
+    if return_missing:
+        return final_df, all_votes, no_good_candidate_count, invalid_votes, missing
     return final_df, all_votes, no_good_candidate_count, invalid_votes
 
 
-def instant_runoff_voting(clean_votes):
+def instant_runoff_voting(clean_votes, tally='full', elimination='single'):
     """
     Conducts an Instant-Runoff Voting (IRV) process on a DataFrame of ranked voting data.
 
     Args:
     clean_votes (pd.DataFrame): DataFrame containing ranked voting data.
+    tally (str): 'full' to recount every ballot in each round, or 'incremental' to only re-route
+                 the ballots of the eliminated candidate. Both give identical results.
+    elimination (str): 'single' or 'bulk', see instant_runoff_tally.
 
     Returns:
-    tuple: A tuple containing the winner's name, detailed information about each round,
-           and the total number of rounds conducted.
+    tuple: A tuple containing the winner's name, the RoundResults of the count and the total number
+           of rounds conducted.
     """
+    from helper_functions import ballot_patterns, encode_ballots
+
 
     # Extract only the columns with voting choices (assuming first two columns are not choices)
     votes_df = clean_votes.iloc[:, 2:]
-    print(votes_df.iloc[:, 0].unique())
 
-    rounds_info = []  # To store information about each round
+    # Encode candidate names as integer IDs once and count each distinct ranking only once
+    ballots, candidates = encode_ballots(votes_df)
+    patterns, weights, _ = ballot_patterns(ballots)
+    return instant_runoff_tally(patterns, candidates, tally, weights=weights, elimination=elimination)
+
+
+def instant_runoff_tally(ballots, candidates, tally='full', progress=None, weights=None, elimination='single'):
+    """
+    Conducts an Instant-Runoff Voting (IRV) process on integer-encoded ballots.
+
+    Eliminated candidates are tracked with a boolean mask and each round only looks up the current
+    top choice of the ballots, so no rows are ever copied or shifted. The rounds are recorded in a
+    RoundResults, including how many ballots of the eliminated candidates ranked no remaining candidate.
+
+    Ties for the fewest votes are broken deterministically: of the tied candidates, the one whose
+    earliest counting ballot comes first in the input is eliminated.
+
+    With bulk elimination, each round drops the largest group of trailing candidates whose combined votes
+    are fewer than the votes of the next candidate. None of them could overtake that candidate with the
+    ballots of the others, so the winner is the same as with sequential elimination in fewer rounds.
+
+    Args:
+    ballots (np.ndarray): Ballot matrix of candidate IDs, -1 for empty preference levels.
+    candidates (list): Candidate names indexed by their ID.
+    tally (str): 'full' to recount every ballot in each round, or 'incremental' to only re-route
+                 the ballots of the eliminated candidate. Both give identical results.
+    progress (callable, optional): Called as progress('round', message) after every counting round.
+    weights (np.ndarray, optional): If given, the ballots are distinct patterns as returned by ballot_patterns
+                                    and weights holds how often each was cast. The results are the same
+                                    as for the full ballot matrix.
+    elimination (str): 'single' to eliminate one candidate per round, or 'bulk' to eliminate every
+                       group of candidates that can no longer win at once.
+
+    Returns:
+    tuple: A tuple containing the winner's name, the RoundResults of the count and the total number
+           of rounds conducted.
+    """
+    import numpy as np
+    from round_results import RoundResults
+    from tally import FullTally, IncrementalTally
+
+    if elimination not in ('single', 'bulk'):
+        raise ValueError(f"Unknown elimination mode '{elimination}', expected 'single' or 'bulk'.")
+
+    if tally == 'full':
+        counter = FullTally(ballots, len(candidates), weights)
+    elif tally == 'incremental':
+        counter = IncrementalTally(ballots, len(candidates), weights)
+    else:
+        raise ValueError(f"Unknown tally mode '{tally}', expected 'full' or 'incremental'.")
+
+    rounds = RoundResults(candidates)  # To store information about each round
     round_number = 0  # Initialize round counter
 
     while True:
         round_number += 1
         # Count the first-choice votes for each candidate
-        first_choices = votes_df.iloc[:, 0].value_counts()
+        counts = counter.counts
+        present = np.flatnonzero(counts)
+        if len(present) == 0:
+            break
+
+        # Order candidates like value_counts(): most votes first, ties by first appearance
+        present = present[np.argsort(counter.first_seen[present], kind='stable')]
+        present = present[np.argsort(-counts[present], kind='stable')]
 
         # Record the vote counts for this round
-        rounds_info.append({'Round': round_number, 'Votes': first_choices.to_dict(), 'Eliminated': 'None'})
+        rounds.add_round(counts, present)
+        if progress is not None:
+            progress('round', f'round {round_number} of at most {len(candidates)}')
 
         # Check if a candidate has more than 50% of the votes
-        if (first_choices / first_choices.sum()).max() > 0.5:
-            winner = first_choices.idxmax()  # Identify the winner
-            return winner, rounds_info, round_number
+        if counts[present[0]] / counts.sum() > 0.5:
+            winner = candidates[present[0]]  # Identify the winner
+            return winner, rounds, round_number
 
-        # If no winner, find the candidate with the least votes
-        least_votes_candidate = first_choices.idxmin()
+        # If no winner, order the candidates from the fewest votes, ties by first appearance
+        trailing = present[np.lexsort((counter.first_seen[present], counts[present]))]
+        n_eliminated = 1
+        if elimination == 'bulk':
+            # The largest trailing group whose combined votes are fewer than the votes of the next candidate
+            defeated = np.flatnonzero(np.cumsum(counts[trailing[:-1]]) < counts[trailing[1:]])
+            n_eliminated = defeated[-1] + 1 if len(defeated) else 1
+        eliminated = trailing[:n_eliminated]
 
-        # Record the candidate's elimination
-        rounds_info[-1]['Eliminated'] = least_votes_candidate
+        # Mask the eliminated candidates; the next round skips them on every ballot
+        exhausted = counter.eliminate(eliminated)
 
-        # Update the DataFrame to remove the eliminated candidate and shift choices leftward
-        votes_df = votes_df.apply(lambda row: shift_choices(row, least_votes_candidate), axis=1, result_type='expand')
+        # Record the candidates' elimination; their transfers follow from the votes of the next round
+        rounds.eliminate(eliminated, exhausted)
 
-    return "No winner found", rounds_info, round_number
+    return "No winner found", rounds, round_number
 
 
-def plot_instant_runoff_results(rounds_info,store_path, region, invalid_specifier):
+def encode_regions(file_path, chunk_size=None, input_df=None, metrics=None, aliases=None):
     """
-    Generates visualizations for Instant-Runoff Voting results, including a horizontal stacked bar chart
-    and a series of pie charts for each round of voting.
+    Reads and encodes the ballots of every region in an input file once, for both invalid-vote variants.
 
     Args:
-    rounds_info (list of dicts): A list containing vote counts and eliminated candidates for each round.
-    region (str): The name of the region, used for labeling the output files.
-    """
+    file_path (str): Path to the Excel file containing voting data.
+    chunk_size (int, optional): If set, the file (Excel or CSV) is streamed in chunks of this many rows
+                                and encoded on the fly instead of being loaded as a whole.
+    input_df (df, optional): The already loaded content of the file, e.g. from InputPreview.frame().
+    metrics (RunMetrics, optional): Records the 'read' and 'clean' stages.
+    aliases (dict, optional): Alternative spellings of candidate names, see CandidateRegistry.
 
-    # Convert rounds_info to a DataFrame for easy plotting
-    rounds_df = pd.DataFrame([round['Votes'] for round in rounds_info])
-    rounds_df.fillna(0, inplace=True)  # Replace NaN with 0 for plotting
+    Returns:
+    dict: A dictionary mapping each region name to its BallotEncoder.
+    """
+    from ballot_encoder import BallotEncoder
+
+    if input_df is None and chunk_size is not None:
+        encoders = encode_input_chunks(file_path, chunk_size, aliases)
+        if metrics is not None:
+            # Reading and cleaning are interleaved chunk by chunk, so they are recorded as one stage
+            metrics.lap('read', rows=max([encoder.all_votes for encoder in encoders.values()], default=0))
+        return encoders
+
+    if input_df is None:
+        input_df = input_excel(file_path)
+    if metrics is not None:
+        metrics.lap('read', rows=len(input_df))
+    encoders = {}
+    for region in input_df.columns[1:]:
+        encoders[region] = BallotEncoder(aliases)
+        encoders[region].add(input_df[region])
+        if metrics is not None:
+            metrics.lap('clean', region, rows=len(input_df))
+    return encoders
 
-    # Set up the plot parameters
-    num_rounds = len(rounds_df)
-    candidates = rounds_df.columns
-    colors = plt.cm.viridis_r(np.linspace(0, 1, len(candidates)))  # Assign colors to candidates
 
-    # Create a horizontal stacked bar chart
-    plt.figure(figsize=(15, 8))
+def load_region_ballots(file_path, consider_invalid=False, chunk_size=None, aliases=None):
+    """
+    Reads, cleans and encodes the ballots of every region in an input file.
 
-    ax = rounds_df.plot(kind='barh', stacked=True, color=colors, legend=False)
-    plt.title(f'Considered Votes per Candidate per Counting Round in {region}')
-    plt.ylabel('Counting')
-    plt.xlabel('Number of Votes')
+    Args:
+    file_path (str): Path to the Excel file containing voting data.
+    consider_invalid (bool): Flag to determine whether to consider invalid votes.
+    chunk_size (int, optional): If set, the file (Excel or CSV) is streamed in chunks of this many rows
+                                and encoded on the fly instead of being loaded as a whole.
+    aliases (dict, optional): Alternative spellings of candidate names, see CandidateRegistry.
 
+    Returns:
+    dict: A dictionary mapping each region to a tuple of the distinct ballots, candidate names, total votes,
+          count of 'no good candidate' votes, count of invalid votes, how often each distinct ballot was cast,
+          and the missing candidates of the distinct invalid votes and how often each was cast, see
+          BallotEncoder.finish.
+    """
+    encoders = encode_regions(file_path, chunk_size, aliases=aliases)
+    return {region: encoder.finish(consider_invalid) for region, encoder in encoders.items()}
 
-    # Draw a dashed line indicating the 50% vote threshold
-    '''If accounting for invalid votes, this threhsold might change, because some voters might only have voted for 
-    one eliminated candidate and thus have no vote regarding the remaining set of candidates'''
 
-    half_votes = rounds_df.sum(axis=1) * 0.5
-    for i in half_votes.index:
-        label = '50% (required simple majority)' if i == 0 else None
-        plt.plot([half_votes[i],half_votes[i]],[i-0.5,i+0.5],color='grey', linestyle='--', label=label, alpha=0.7)
+def run_instant_runoff(file_path,store_path, consider_invalid=False, chunk_size=None, use_cache=False, workers=None,
+                       plots='inline', progress=None, cancel_event=None, input_df=None, method='irv', seats=1,
+                       verbose=False, trace_memory=False, export='xlsx', elimination='single', aliases=None,
+                       preview=None):
+    """
+    Executes the Instant-Runoff Voting process for a given Excel file. This includes data processing,
+    running the IRV algorithm, plotting results, and saving the data and plots.
 
-    # Position the legend outside the plot
-    plt.yticks(range(num_rounds), ['Round ' + str(i + 1) for i in range(num_rounds)], rotation=0)
+    Args:
+    file_path (str): Path to the Excel file containing voting data.
+    consider_invalid (bool or str): Flag to determine whether to consider invalid votes, or 'both' to
+                                    evaluate both variants from a single parse of the file. The outputs
+                                    of each variant are then saved in a 'with_invalid' and a
+                                    'without_invalid' folder in store_path.
+    chunk_size (int, optional): If set, the file (Excel or CSV) is streamed in chunks of this many rows
+                                and encoded on the fly instead of being loaded as a whole.
+    use_cache (bool): Flag to reuse the encoded ballots from earlier runs on the same file content.
+                      The cache lives in a 'ballot_cache' folder in store_path and is size-bounded.
+    workers (int, optional): If larger than 1, the regions are evaluated in parallel in this many processes.
+    plots (str): 'inline' to render the charts of each region right after its results, 'deferred' to
+                 render all charts in a separate process once every numeric result is saved, or 'none'
+                 to skip the charts (and the matplotlib import) entirely.
+    progress (callable, optional): Called as progress(phase, message, seconds, fraction) after each step,
+                                   see ProgressReporter. With workers, only whole regions are reported.
+    cancel_event (threading.Event, optional): Set it to cancel the evaluation; run_instant_runoff then
+                                              raises EvaluationCancelled at the next step.
+    input_df (df, optional): The already loaded content of the file, e.g. from InputPreview.frame(), so that
+                             the file is not read again. The file is still hashed for the cache.
+    preview (InputPreview, optional): The preview of the file shown in a GUI. If the file is unchanged since
+                                      the preview was opened, its rows are reused and only the rest of the
+                                      file is read, with progress events and cancel checks. It is not read
+                                      at all if the ballots are taken from the cache.
+    method (str): The counting method: 'irv' for Instant-Runoff Voting, 'stv' for the Single Transferable
+                  Vote with seats seats, or 'borda' or 'schulze' as cross-checks of the single winner.
+                  The results of the other methods are saved as '{region}_{method}{invalid_specifier}.xlsx'.
+    seats (int): Number of seats to fill with 'stv'.
+    elimination (str): 'single' to eliminate one candidate per IRV round, or 'bulk' to eliminate every
+                       group of candidates that can no longer win at once, see instant_runoff_tally.
+    export (str): The format of the result tables: 'xlsx' for one Excel file per table, 'workbook' for a
+                  single 'results_{invalid_specifier}.xlsx' per output folder and variant with one sheet per
+                  region and table, or 'csv' or 'parquet' (needs pyarrow or fastparquet) for one file per table.
+    aliases (dict, optional): Maps alternative spellings of candidate names onto their canonical name,
+                              e.g. {'Jon Doe': 'John Doe'}. Prefixes, case and whitespace are always
+                              normalised, see CandidateRegistry.
+    verbose (bool): Flag to print the wall time, memory and row count of every stage at the end.
+    trace_memory (bool): Flag to also record the peak Python allocations per stage with tracemalloc.
+
+    The function saves the results as Excel (or CSV/Parquet) files and plots as images for each region in the dataset,
+    and the metrics of every stage (see RunMetrics) as 'run_metrics.json' in store_path.
 
-    plt.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=2)
-    plt.tight_layout()
-    plt.savefig(f'{store_path}/{region}_Votes_BarChart_{invalid_specifier}.png')
+    Returns:
+    list of dicts: One summary per region and invalid-vote variant, as returned by evaluate_region.
+    """
+    import numpy as np
+    from ballot_cache import cache_key, load_cached_ballots, store_cached_ballots
+    from export import EXPORT_FORMATS, WORKBOOK_NAME, save_workbook
+    from metrics import RunMetrics
+
+    if plots not in ('inline', 'deferred', 'none'):
+        raise ValueError(f"Unknown plots option '{plots}', expected 'inline', 'deferred' or 'none'.")
+    if method not in ('irv', 'stv', 'borda', 'schulze'):
+        raise ValueError(f"Unknown method '{method}', expected 'irv', 'stv', 'borda' or 'schulze'.")
+    if export not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export}', expected 'xlsx', 'workbook', 'csv' or 'parquet'.")
+    if elimination not in ('single', 'bulk'):
+        raise ValueError(f"Unknown elimination mode '{elimination}', expected 'single' or 'bulk'.")
+    if seats < 1:
+        raise ValueError(f'Invalid number of seats {seats}, expected at least 1.')
+    variants = [False, True] if consider_invalid == 'both' else [consider_invalid]
+    report = ProgressReporter(progress, cancel_event)
+    metrics = RunMetrics(trace_memory)
+
+    # Process the Excel file to obtain voting data, or take the encoded ballots from the cache.
+    # The file is parsed at most once; invalid votes are only a mask on the shared ballot matrix.
+    tasks = []
+    encoders = None
+    for variant in variants:
+        invalid_specifier = 'with_invalid' if variant else 'without_invalid'
+        variant_path = store_path
+        if len(variants) > 1:
+            variant_path = os.path.join(store_path, invalid_specifier)
+            os.makedirs(variant_path, exist_ok=True)
+
+        regions = None
+        if use_cache:
+            cache_dir = os.path.join(store_path, 'ballot_cache')
+            key = cache_key(file_path, variant, aliases)
+            regions = load_cached_ballots(cache_dir, key)
+            if regions is not None:
+                metrics.lap('cache', rows=sum(region_ballots[2] for region_ballots in regions.values()))
+                report('parse', f'Loaded the {invalid_specifier} ballots from the cache')
+        if regions is None:
+            if encoders is None:
+                if input_df is None and preview is not None and preview.is_current():
+                    input_df = preview.frame(report)
+                encoders = encode_regions(file_path, chunk_size, input_df, metrics, aliases)
+                report('parse', f'Read and parsed {os.path.basename(file_path)}')
+            regions = {}
+            for region, encoder in encoders.items():
+                regions[region] = encoder.finish(variant)
+                metrics.lap('validate', f'{region} ({invalid_specifier})', rows=regions[region][2])
+                report('clean', f'{region} ({invalid_specifier}): {len(regions[region][0])} ballots counted')
+            if use_cache:
+                store_cached_ballots(cache_dir, key, regions)
+                metrics.lap('cache')
+
+        for region, region_ballots in regions.items():
+            tasks.append((region, region_ballots, variant_path, invalid_specifier))
+
+    # One step for parsing, one per region and one for deferred charts
+    report.total_steps = 1 + len(tasks) + (plots == 'deferred')
+    report.completed_steps = 1
+
+    # Evaluate each region; errors are collected so that one failing region does not stop the others
+    errors = {}
+    charts = []
+    summaries = []
+    workbooks = {}  # The result tables of each workbook with export='workbook'
+    render_inline = plots == 'inline'
+    if workers is None or workers <= 1:
+        for region, region_ballots, variant_path, invalid_specifier in tasks:
+            task = f'{region} ({invalid_specifier})'
+            try:
+                chart, summary = evaluate_region(region, region_ballots, variant_path, invalid_specifier, render_inline,
+                                                 progress=lambda phase, message: report(phase, f'{task}: {message}'),
+                                                 method=method, seats=seats, trace_memory=trace_memory,
+                                                 export=export, elimination=elimination)
+                charts.append(chart)
+                summaries.append(summary)
+                metrics.stages.extend(summary.pop('stages'))
+                if export == 'workbook':
+                    workbook_path = os.path.join(variant_path, WORKBOOK_NAME.format(invalid_specifier=invalid_specifier))
+                    workbooks.setdefault(workbook_path, {}).update(summary.pop('tables'))
+            except EvaluationCancelled:
+                raise
+            except Exception as e:
+                errors[task] = e
+            report.completed_steps += 1
+    else:
+        # Each region runs in its own process, since matplotlib is not thread-safe
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for region, (ballots, *counts, weights, missing, missing_weights), variant_path, invalid_specifier in tasks:
+                # Pass cached, memory-mapped ballots to the workers as plain arrays
+                region_ballots = (np.asarray(ballots), *counts, np.asarray(weights), np.asarray(missing),
+                                  np.asarray(missing_weights))
+                future = pool.submit(evaluate_region, region, region_ballots, variant_path, invalid_specifier,
+                                     render_inline, method=method, seats=seats, trace_memory=trace_memory,
+                                     export=export, elimination=elimination)
+                futures[f'{region} ({invalid_specifier})'] = (future, variant_path)
+            for task, (future, variant_path) in futures.items():
+                try:
+                    chart, summary = future.result()
+                    charts.append(chart)
+                    summaries.append(summary)
+                    metrics.stages.extend(summary.pop('stages'))
+                    if export == 'workbook':
+                        workbook_path = os.path.join(variant_path,
+                                                     WORKBOOK_NAME.format(invalid_specifier=summary['variant']))
+                        workbooks.setdefault(workbook_path, {}).update(summary.pop('tables'))
+                    report.completed_steps += 1
+                    report('save', f'{task}: done')
+                except EvaluationCancelled:
+                    pool.shutdown(cancel_futures=True)
+                    raise
+                except Exception as e:
+                    errors[task] = e
+
+    # Write the tables of all regions of an output folder into one workbook in a single pass
+    if workbooks:
+        metrics.lap('evaluate')
+    for workbook_path, tables in workbooks.items():
+        try:
+            save_workbook(tables, workbook_path)
+        except Exception as e:
+            errors[workbook_path] = e
+        metrics.lap('save', rows=len(tables))
+
+    # Render the charts of all regions in one separate process after the numeric results are saved
+    if plots == 'deferred' and charts:
+        metrics.lap('evaluate')
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                pool.submit(render_charts, charts).result()
+            except Exception as e:
+                errors['charts'] = e
+        metrics.lap('plot', rows=len(charts))
+        report.completed_steps += 1
+        report('plot', 'Rendered all charts')
+
+    # Save the metrics of every stage next to the outputs
+    metrics.stop()
+    metrics.write(os.path.join(store_path, 'run_metrics.json'), file=file_path, consider_invalid=consider_invalid,
+                  method=method, workers=workers, plots=plots)
+    if verbose:
+        print(metrics.format_table())
+
+    if errors:
+        raise RuntimeError('Evaluation failed for ' + '; '.join(f'{task}: {error}' for task, error in errors.items()))
+    return summaries
+
+
+def evaluate_region(region, region_ballots, store_path, invalid_specifier, render=True, progress=None, method='irv',
+                    seats=1, trace_memory=False, export='xlsx', elimination='single'):
+    """
+    Runs the Instant-Runoff Voting algorithm (or another counting method) for a single region and saves
+    its data and plots.
 
-    # # Set up a grid of subplots for pie charts
-    # cols = 3  # Max number of columns
-    # rows = math.ceil(num_rounds / cols)  # Calculate the number of rows needed
-    # fig, axes = plt.subplots(rows, cols, figsize=(15, 6 * rows))
-    # axes = axes.flatten()  # Flatten axes for easy iteration
-    #
-    # # Create a pie chart for each round
-    # for i in range(num_rounds):
-    #     round_data = rounds_df.iloc[i]
-    #     round_data = round_data[round_data > 0]  # Exclude candidates with 0 votes
-    #     axes[i].pie(round_data, labels=None, autopct='%1.1f%%', colors=colors, startangle=140)
-    #     axes[i].set_title(f'Round {i + 1}')
-    #
-    # # Hide any unused subplots
-    # for j in range(i + 1, len(axes)):
-    #     axes[j].axis('off')
-    #
-    # # Create a legend for the pie charts
-    # fig.legend(rounds_df.columns, title='Candidates', loc='center left', bbox_to_anchor=(1, 0.5))
-    #
-    # plt.suptitle(f'Vote Share per Round in {region}')
-    # plt.subplots_adjust(right=0.7)
-    # plt.tight_layout()
-    # fig.savefig(f'{store_path}/{region}_Votes_PieCharts_{invalid_specifier}.png')
+    Args:
+    region (str): The name of the region, used for labeling the output files.
+    region_ballots (tuple): Distinct ballots, candidate names, total votes, count of 'no good candidate'
+                            votes, count of invalid votes, ballot weights and the missing candidates of the
+                            invalid votes with their weights, as returned by load_region_ballots.
+    store_path (str): Directory in which the output files are saved.
+    invalid_specifier (str): 'with_invalid' or 'without_invalid', used for labeling the output files.
+    render (bool): Flag to render the charts right away.
+    progress (callable, optional): Called as progress(phase, message) after each round and step.
+    method (str): The counting method, see run_instant_runoff.
+    seats (int): Number of seats to fill with 'stv'.
+    trace_memory (bool): Flag to also record the peak Python allocations per stage with tracemalloc.
+    export (str): The format of the result tables, see run_instant_runoff. With 'workbook', the tables are
+                  not saved but returned in the summary ('tables'), to be written by save_workbook.
+    elimination (str): 'single' or 'bulk', see instant_runoff_tally.
 
-def plot_test_eligibility(vote_dict,store_path, region, invalid_specifier):
+    Returns:
+    tuple: The chart data of the region, which can be passed to render_charts later, and a summary
+           dict with the winner, the number of rounds, the vote counts, the time taken and the
+           metrics of each stage ('stages', see RunMetrics).
     """
-    Generates a pie chart visualization for vote categories in a specified region.
+    import pandas as pd
+    from candidate_registry import is_no_good
+    from export import save_table
+    from methods import borda_count, schulze_method, single_transferable_vote
+    from metrics import RunMetrics
+
+    start = time.perf_counter()
+    (ballots, candidates, all_votes, no_good_candidate_count, invalid_votes, weights,
+     missing, missing_weights) = region_ballots
+    metrics = RunMetrics(trace_memory)
+    task = f'{region} ({invalid_specifier})'
+    reporter = progress
+
+    # Record every progress event as the end of a stage
+    def progress(phase, message):
+        metrics.lap(phase, task)
+        if reporter is not None:
+            reporter(phase, message)
+
+    # Create a dictionary for vote categories and their counts
+    vote_dict = {
+        f'valid votes ({all_votes - no_good_candidate_count - invalid_votes})': all_votes - no_good_candidate_count - invalid_votes,
+        f'no good candidates ({no_good_candidate_count})': no_good_candidate_count,
+        f'invalid votes ({invalid_votes})': invalid_votes
+    }
+
+    # Collect the result tables as (sheet name, file name, table), starting with the vote validity
+    tables = [(f'{region} validity', f'{region}_validity_vote', pd.DataFrame(vote_dict, index=[0])),
+              (f'{region} missing', f'{region}_missing_candidates{invalid_specifier}',
+               missing_table(candidates, missing, missing_weights))]
+
+    if method == 'irv':
+        # Run the Instant-Runoff Voting algorithm
+        winner, rounds, total_rounds = instant_runoff_tally(ballots, candidates, progress=progress, weights=weights,
+                                                            elimination=elimination)
 
-    Args:
-    vote_dict (dict): A dictionary with keys as vote categories and values as their counts.
-    region (str): The name of the region for which the pie chart is generated.
+        # The results of each round, built directly from the round arrays
+        rounds_df = rounds.frame()
+        rounds_df['Eliminated'] = [', '.join(rounds.eliminated_in(i)) or 'None' for i in range(len(rounds))]
+        rounds_df['Elimination Round'] = range(1, len(rounds_df) + 1)
+        tables.append((f'{region} votes', f'{region}_votes{invalid_specifier}', rounds_df))
+        tables.append((f'{region} transfers', f'{region}_transfers{invalid_specifier}', transfer_table(rounds)))
+    elif method == 'stv':
+        elected, rounds_info, total_rounds = single_transferable_vote(ballots, candidates, seats, weights, progress)
+        winner = ', '.join(elected) if elected else "No winner found"
 
-    The function saves the generated pie chart as a PNG file.
+        # The results of each round, built directly from the round data
+        rounds_df = pd.DataFrame([round['Votes'] for round in rounds_info])
+        rounds_df['Eliminated'] = [round['Eliminated'] for round in rounds_info]
+        rounds_df['Elected'] = [round['Elected'] for round in rounds_info]
+        rounds_df['Elimination Round'] = range(1, len(rounds_df) + 1)
+        tables.append((f'{region} stv', f'{region}_stv{invalid_specifier}', rounds_df))
+    elif method == 'borda':
+        winner, scores = borda_count(ballots, candidates, weights)
+        total_rounds = None
+        # A Series keeps the order of the scores, highest first; a DataFrame from a dict would sort the names
+        tables.append((f'{region} borda', f'{region}_borda{invalid_specifier}', pd.Series(scores, name='Borda score').to_frame()))
+    else:
+        # Save the pairwise preferences, ranked by the number of candidates beaten on strongest paths
+        winner, ranking, preferences, paths = schulze_method(ballots, candidates, weights)
+        total_rounds = None
+        counted = [name for name in candidates if not is_no_good(name)]
+        schulze_df = pd.DataFrame(preferences, index=counted, columns=counted)
+        schulze_df['Beaten on strongest paths'] = (paths > paths.T).sum(axis=1)
+        tables.append((f'{region} schulze', f'{region}_schulze{invalid_specifier}', schulze_df.loc[ranking]))
+    if export != 'workbook':
+        for _, name, table in tables:
+            save_table(table, store_path, name, export)
+    progress('save', 'saved the results')
+
+    # The round chart marks the 50% majority, which only applies to Instant-Runoff Voting
+    chart = (region, vote_dict, rounds if method == 'irv' else None, store_path, invalid_specifier)
+    if render:
+        render_charts([chart])
+        progress('plot', 'rendered the charts')
+    metrics.stop()
+
+    summary = {
+        'region': region,
+        'variant': invalid_specifier,
+        'method': method,
+        'winner': winner,
+        'rounds': total_rounds,
+        'valid votes': all_votes - no_good_candidate_count - invalid_votes,
+        'no good candidates': no_good_candidate_count,
+        'invalid votes': invalid_votes,
+        'seconds': time.perf_counter() - start,
+        'stages': metrics.stages,
+    }
+    if export == 'workbook':
+        summary['tables'] = {sheet: table for sheet, _, table in tables}
+    return chart, summary
+
+
+def transfer_table(rounds):
     """
+    Builds the candidate-to-candidate transfer matrix of an Instant-Runoff Voting count.
 
-    # Assign different colors for each vote category
-    colors = plt.cm.viridis_r(np.linspace(0, 1, len(vote_dict.keys())))
+    Args:
+    rounds (RoundResults): The rounds as returned by instant_runoff_tally.
 
-    # Create a DataFrame from the vote dictionary for easy plotting
-    chart_df = pd.DataFrame(vote_dict, index=[0])
+    Returns:
+    pd.DataFrame: One row per elimination round, in the order of elimination, with the number of the eliminated
+                  candidates' ballots that went to each candidate, the number of exhausted ballots and the round.
+    """
+    import numpy as np
+    import pandas as pd
 
-    # Create a figure for the pie chart
-    plt.figure()
-    # Generate the pie chart using the flattened values of the DataFrame
-    plt.pie(chart_df.values.flatten(), colors=colors, labels=chart_df.columns, autopct='%1.1f%%', startangle=140)
-    # Set the title of the pie chart including the total number of votes
-    plt.title(f"Vote Validity in {region} ({chart_df.values.flatten().sum()})")
-    plt.tight_layout()
+    elimination_rounds = np.unique(rounds.eliminated[rounds.eliminated >= 0])
+    columns = rounds.columns()
+    transfers_df = pd.DataFrame(rounds.transfers()[elimination_rounds][:, columns],
+                                index=pd.Index([', '.join(rounds.eliminated_in(i)) for i in elimination_rounds],
+                                               name='Eliminated'),
+                                columns=[rounds.candidates[c] for c in columns])
+    transfers_df['Exhausted'] = rounds.exhausted[elimination_rounds]
+    transfers_df['Elimination Round'] = elimination_rounds + 1
+    return transfers_df
 
-    # Save the pie chart as a PNG file
-    plt.savefig(f'{store_path}/{region}_Validity_Votes_PieCharts_{invalid_specifier}.png')
 
-def run_instant_runoff(file_path,store_path, consider_invalid=False):
+def missing_table(candidates, missing, weights):
     """
-    Executes the Instant-Runoff Voting process for a given Excel file. This includes data processing,
-    running the IRV algorithm, plotting results, and saving the data and plots.
+    Builds the report of the candidates missing from the invalid votes, with one row per distinct set of
+    missing candidates, so its size does not grow with the number of voters.
 
     Args:
-    file_path (str): Path to the Excel file containing voting data.
-    consider_invalid (bool): Flag to determine whether to consider invalid votes.
+    candidates (list): The candidate names indexed by their ID.
+    missing (np.ndarray): Boolean matrix of shape invalid votes x candidates, True where a candidate is missing,
+                          as returned by BallotEncoder.finish.
+    weights (np.ndarray): How often each invalid vote was cast.
 
-    The function saves the results as Excel files and plots as images for each region in the dataset.
+    Returns:
+    pd.DataFrame: One boolean column per real candidate (True if missing) and the number of ballots missing
+                  exactly these candidates ('Ballots'), most frequent first.
     """
-    if consider_invalid:
-        invalid_specifier = 'with_invalid'
-    else:
-        invalid_specifier = 'without_invalid'
-    # Process the Excel file to obtain voting data
-    input_df = input_excel(file_path)
+    import numpy as np
+    import pandas as pd
+    from candidate_registry import is_no_good
 
-    # Iterate through each region in the processed data
-    for region in input_df.columns[1:]:
-        # Clean up and prepare the DataFrame for IRV
-        final_df, all_votes, no_good_candidate_count, invalid_votes = clean_up_dataframe(input_df[['Voter-ID', region]], consider_invalid)
-
-        # Create a dictionary for vote categories and their counts
-        vote_dict = {
-            f'valid votes ({all_votes - no_good_candidate_count - invalid_votes})': all_votes - no_good_candidate_count - invalid_votes,
-            f'no good candidates ({no_good_candidate_count})': no_good_candidate_count,
-            f'invalid votes ({invalid_votes})': invalid_votes
-        }
+    counted = [i for i, name in enumerate(candidates) if not is_no_good(name)]
+    missing = np.asarray(missing, dtype=bool)[:, counted]
+    if len(missing):
+        missing, inverse = np.unique(missing, axis=0, return_inverse=True)
+        weights = np.bincount(inverse.ravel(), weights=weights, minlength=len(missing)).astype(np.int64)
+    missing_df = pd.DataFrame(missing, columns=[candidates[i] for i in counted])
+    missing_df['Ballots'] = np.asarray(weights, dtype=np.int64)
+    return missing_df.sort_values('Ballots', ascending=False, kind='stable', ignore_index=True)
 
-        # Plot the eligibility of votes (valid, no good candidates, invalid)
-        plot_test_eligibility(vote_dict,store_path, region, invalid_specifier)
 
-        # Run the Instant-Runoff Voting algorithm
-        winner, rounds_info, total_rounds = instant_runoff_voting(final_df)
+def render_charts(charts):
+    """
+    Renders the vote validity pie chart, the round-by-round bar chart and the transfer chart for a list of regions.
+    matplotlib is only imported here, so runs without charts never load it.
 
-        # Save the vote validity and IRV results to Excel files
-        vote_validity = pd.DataFrame(vote_dict, index=[0])
-        vote_validity.to_excel(f'{store_path}/{region}_validity_vote.xlsx')
+    Args:
+    charts (list of tuples): Chart data as returned by evaluate_region.
+    """
+    from plotting import plot_instant_runoff_results, plot_test_eligibility, plot_transfers
 
-        elim_df = pd.DataFrame([round['Eliminated'] for round in rounds_info])
-        rounds_df = pd.DataFrame([round['Votes'] for round in rounds_info])
-        rounds_df['Eliminated'] = elim_df
-        rounds_df['Elimination Round'] = range(1, len(rounds_df) + 1)
-        rounds_df.to_excel(f'{store_path}/{region}_votes{invalid_specifier}.xlsx')
+    for region, vote_dict, rounds, store_path, invalid_specifier in charts:
+        # Plot the eligibility of votes (valid, no good candidates, invalid)
+        plot_test_eligibility(vote_dict,store_path, region, invalid_specifier)
 
-        # Plot the results of each round of Instant-Runoff Voting
-        plot_instant_runoff_results(rounds_info,store_path, region, invalid_specifier)
+        # Plot the results of each round of Instant-Runoff Voting, unless nobody ranked a candidate
+        if rounds is not None and rounds.votes.any():
+            plot_instant_runoff_results(rounds,store_path, region, invalid_specifier)
+            plot_transfers(rounds, store_path, region, invalid_specifier)
 
 
@@ -0,0 +1,83 @@
+import os
+import re
+
+# Formats of the result tables: one Excel file per table, one workbook per output folder, or CSV/Parquet files
+EXPORT_FORMATS = ('xlsx', 'workbook', 'csv', 'parquet')
+
+# Name of the workbook collecting all result tables of an output folder and invalid-vote variant with
+# export='workbook', so that runs of both variants into the same folder keep their own workbook
+WORKBOOK_NAME = 'results_{invalid_specifier}.xlsx'
+
+
+def save_table(df, store_path, name, export='xlsx'):
+    """
+    Saves a single result table as its own file.
+
+    Args:
+    df (pd.DataFrame): The table to save.
+    store_path (str): Directory in which the file is saved.
+    name (str): The file name without extension, e.g. '{region}_validity_vote'.
+    export (str): 'xlsx', 'csv' or 'parquet' (needs pyarrow or fastparquet).
+    """
+    from helper_functions import save_excel
+
+    path = os.path.join(store_path, f'{name}.{export}')
+    if export == 'xlsx':
+        save_excel(df, path)
+    elif export == 'csv':
+        df.to_csv(path)
+    elif export == 'parquet':
+        df.to_parquet(path)
+    else:
+        raise ValueError(f"Unknown export format '{export}', expected 'xlsx', 'csv' or 'parquet'.")
+
+
+def sheet_name(name, used):
+    """
+    Turns a table name into a valid, unique Excel sheet name.
+
+    Excel limits sheet names to 31 characters and does not allow the characters []:*?/\\ in them.
+
+    Args:
+    name (str): The table name, e.g. '{region} votes'.
+    used (set): The sheet names already taken; the returned name is added to it.
+
+    Returns:
+    str: The sheet name.
+    """
+    base = re.sub(r'[\[\]:*?/\\]', '_', name)[:31]
+    sheet = base
+    number = 2
+    while sheet.lower() in used:
+        suffix = f' ({number})'
+        sheet = base[:31 - len(suffix)] + suffix
+        number += 1
+    used.add(sheet.lower())
+    return sheet
+
+
+def save_workbook(tables, path):
+    """
+    Saves many result tables as the sheets of one workbook, written in a single pass.
+
+    xlsxwriter is used if it is installed, since it writes much faster than openpyxl. Like save_excel,
+    the file bytes only depend on the content.
+
+    Args:
+    tables (dict): Maps each table name to its DataFrame, in the order of the sheets.
+    path (str): The file path of the workbook.
+    """
+    import pandas as pd
+    from helper_functions import normalize_workbook
+
+    try:
+        import xlsxwriter  # noqa: F401
+        engine = 'xlsxwriter'
+    except ImportError:
+        engine = 'openpyxl'
+
+    used = set()
+    with pd.ExcelWriter(path, engine=engine) as writer:
+        for name, df in tables.items():
+            df.to_excel(writer, sheet_name=sheet_name(name, used))
+    normalize_workbook(path)
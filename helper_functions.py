@@ -1,3 +1,5 @@
+import zipfile
+import re
 import pandas as pd
 import numpy as np
 
@@ -32,6 +34,121 @@ def remove_first_four_chars(s):
     return s.apply(lambda x: x[4:].strip() if pd.notna(x) and len(x) > 4 else x)
 
 
+def encode_choices(processed, registry):
+    """
+    Splits ranked-choice strings into one column per preference level and encodes every choice as the
+    ID of its candidate in a single vectorized pass.
+
+    Each string is split by ' > '. The cells are only factorized; the registry normalises each distinct
+    spelling once (letter prefix, case, whitespace and aliases, see CandidateRegistry).
+
+    Args:
+    processed (pd.Series): Strings of the form '[A] Name > [B] Name > ...'.
+    registry (CandidateRegistry): The candidate index of the region, extended by new candidates.
+
+    Returns:
+    np.ndarray: The ballot matrix with one row per string and one column per preference level, with -1
+                for preference levels a voter did not rank.
+    """
+    # One row per (ballot, choice) pair, keeping the ballot index
+    choices = processed.str.split(' > ').explode()
+    codes, spellings = pd.factorize(choices)
+    candidates = registry.encode(spellings)[codes]
+
+    # Pivot back to one column per preference level
+    level = choices.groupby(level=0).cumcount().to_numpy()
+    rows = processed.index.get_indexer(choices.index)
+    ballots = np.full((len(processed), level.max() + 1 if len(level) else 0), -1, dtype=np.int32)
+    ballots[rows, level] = candidates
+    return ballots
+
+
+def parse_ballots(processed, registry=None):
+    """
+    Parses ranked-choice strings into one column per preference level, with the canonical name of the
+    candidate in every cell (e.g. '[A] Name' becomes 'Name' and 'No good Candidate' 'no good candidate').
+
+    Args:
+    processed (pd.Series): Strings of the form '[A] Name > [B] Name > ...'.
+    registry (CandidateRegistry, optional): The candidate index of the region; a new one is used if not given.
+
+    Returns:
+    pd.DataFrame: A DataFrame with the same index as processed and columns 'choice_1', 'choice_2', etc.
+                  Preference levels a voter did not rank are NaN.
+    """
+    from candidate_registry import CandidateRegistry
+
+    if registry is None:
+        registry = CandidateRegistry()
+    ballots = encode_choices(processed, registry)
+
+    # Look up the names once per candidate; the spare last entry turns the -1 codes into NaN
+    names = np.array(registry.names + [np.nan], dtype=object)
+    return pd.DataFrame(names[ballots], index=processed.index,
+                        columns=[f'choice_{i + 1}' for i in range(ballots.shape[1])])
+
+
+def ranked_candidates(ballots, n_candidates):
+    """
+    Marks which candidates appear on each encoded ballot.
+
+    Args:
+    ballots (np.ndarray): Integer ballot matrix with -1 for empty preference levels.
+    n_candidates (int): Number of candidate IDs.
+
+    Returns:
+    np.ndarray: A boolean matrix of shape voters x candidates, True where the candidate is ranked.
+    """
+    # Use a spare column to collect the -1 codes
+    ranked = np.zeros((len(ballots), n_candidates + 1), dtype=bool)
+    ranked[np.arange(len(ballots))[:, None], ballots] = True
+    return ranked[:, :-1]
+
+
+def missing_candidates(choices, candidate_names):
+    """
+    Determines for every ballot which candidates it did not rank, using a candidate index built once.
+
+    Args:
+    choices (pd.DataFrame): DataFrame with one column per preference level.
+    candidate_names (list): The candidates every complete ballot has to rank.
+
+    Returns:
+    pd.DataFrame: A boolean DataFrame with the index of choices and one column per candidate,
+                  True where the candidate is missing from the ballot.
+    """
+    values = choices.to_numpy(dtype=object)
+
+    # Encode every cell against the candidate index; anything else (NaN, 'no good candidate') becomes -1
+    codes = pd.Index(candidate_names).get_indexer(values.ravel()).reshape(values.shape)
+
+    ranked = ranked_candidates(codes, len(candidate_names))
+    return pd.DataFrame(~ranked, index=choices.index, columns=candidate_names)
+
+
+def complete_ballots(choices, candidate_names):
+    """
+    Checks which ballots rank all candidates, or end with 'no good candidate' in their last column.
+
+    Vectorized counterpart of contains_all_elements for a whole DataFrame of ballots.
+
+    Args:
+    choices (pd.DataFrame): DataFrame with one column per preference level.
+    candidate_names (list): The candidates every complete ballot has to rank.
+
+    Returns:
+    tuple: A tuple containing a boolean Series (True for complete ballots) and the boolean
+           DataFrame of missing candidates as returned by missing_candidates.
+    """
+    missing = missing_candidates(choices, candidate_names)
+
+    # Ballots whose last element starts with 'no good candidate' are always accepted
+    last = choices.iloc[:, -1]
+    ends_with_no_good = last.str.lower().str.startswith('no good candidate', na=False)
+
+    return ends_with_no_good | ~missing.any(axis=1), missing
+
+
 # def contains_all_elements(row, elements_list):
 #     """
 #     Checks if all elements in a provided list are present in a DataFrame row.
@@ -93,3 +210,124 @@ def conditional_lowercase(val, strings_to_lowercase):
         return val.lower()
     return val
 
+
+
+def encode_ballots(votes_df):
+    """
+    Encodes a DataFrame of ranked choices as a dense integer matrix over a candidate index.
+
+    Args:
+    votes_df (pd.DataFrame): DataFrame where each row is a ballot and each column a preference level.
+
+    Returns:
+    tuple: A tuple containing the ballot matrix (np.ndarray of shape voters x choices, with -1 for
+           empty preference levels) and the list of candidate names indexed by their integer ID.
+    """
+    values = votes_df.to_numpy(dtype=object)
+    filled = ~pd.isna(values)
+
+    # Number the candidates once, in order of first appearance
+    codes, candidates = pd.factorize(values[filled])
+
+    ballots = np.full(values.shape, -1, dtype=np.int32)
+    ballots[filled] = codes
+    return ballots, list(candidates)
+
+
+def current_top_choices(ballots, eliminated, start=None):
+    """
+    Finds the highest-ranked remaining candidate on each encoded ballot.
+
+    Args:
+    ballots (np.ndarray): Ballot matrix as returned by encode_ballots.
+    eliminated (np.ndarray): Boolean mask over candidate IDs, True for eliminated candidates.
+    start (np.ndarray, optional): Preference level per ballot from which to start searching.
+
+    Returns:
+    tuple: A tuple containing the preference level of the current top choice per ballot and the
+           candidate ID at that level (-1 for exhausted ballots).
+    """
+    # Append a permanently 'eliminated' slot so that empty cells (-1) are always skipped
+    skip = np.append(eliminated, True)
+    remaining = ~skip[ballots]
+    if start is not None:
+        remaining &= np.arange(ballots.shape[1]) >= start[:, None]
+
+    if ballots.shape[1] == 0:
+        # No preference levels at all, e.g. in a region in which nobody ranked a candidate
+        return np.zeros(len(ballots), dtype=np.intp), np.full(len(ballots), -1, dtype=ballots.dtype)
+
+    position = remaining.argmax(axis=1)
+    top = ballots[np.arange(len(ballots)), position]
+    top[~remaining.any(axis=1)] = -1
+    return position, top
+
+
+def ballot_patterns(ballots, weights=None):
+    """
+    Reduces a ballot matrix to its distinct ballots and how often each one was cast.
+
+    The patterns are ordered by their first occurrence, so the lowest pattern index counting for a
+    candidate orders tied candidates the same way as the lowest ballot index does.
+
+    Args:
+    ballots (np.ndarray): Ballot matrix as returned by encode_ballots.
+    weights (np.ndarray, optional): Number of times each row was cast, if the rows are already patterns
+                                    (e.g. of several chunks); the weights of identical rows are added up.
+
+    Returns:
+    tuple: A tuple containing the matrix of distinct ballots, the number of times each was cast and
+           the pattern index of every ballot.
+    """
+    if len(ballots) == 0:
+        return ballots, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Pack each row into one integer if it fits, which is much faster to sort than whole rows
+    base = int(ballots.max()) + 2
+    if base ** ballots.shape[1] < 2 ** 62:
+        keys = (ballots.astype(np.int64) + 1) @ (base ** np.arange(ballots.shape[1], dtype=np.int64))
+        _, first_index, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+        patterns = ballots[first_index]
+    else:
+        patterns, first_index, inverse, counts = np.unique(ballots, axis=0, return_index=True,
+                                                           return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    if weights is not None:
+        counts = np.bincount(inverse, weights=weights, minlength=len(patterns)).astype(np.int64)
+    order = np.argsort(first_index)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return patterns[order], counts[order], rank[inverse]
+
+
+def save_excel(df, path):
+    """
+    Saves a DataFrame as an Excel file whose bytes only depend on its content.
+
+    Args:
+    df (pd.DataFrame): The DataFrame to save.
+    path (str): The file path of the Excel file.
+    """
+    df.to_excel(path)
+    normalize_workbook(path)
+
+
+def normalize_workbook(path):
+    """
+    Replaces the timestamps in a saved Excel file by a fixed date.
+
+    openpyxl stamps the creation time into the document properties and into every zip entry.
+    These timestamps are replaced by a fixed date, so that repeated or parallel runs produce
+    byte-for-byte identical files.
+
+    Args:
+    path (str): The file path of the Excel file.
+    """
+    with zipfile.ZipFile(path) as archive:
+        entries = [(info, archive.read(info)) for info in archive.infolist()]
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for info, data in entries:
+            if info.filename == 'docProps/core.xml':
+                data = re.sub(rb'(<dcterms:(created|modified)[^>]*>)[^<]*', rb'\g<1>1980-01-01T00:00:00Z', data)
+            archive.writestr(zipfile.ZipInfo(info.filename, date_time=(1980, 1, 1, 0, 0, 0)), data, zipfile.ZIP_DEFLATED)
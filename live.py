@@ -0,0 +1,204 @@
+import argparse
+import copy
+import io
+import os
+import sys
+import time
+import zipfile
+import pandas as pd
+from ballot_encoder import BallotEncoder
+from candidate_registry import load_aliases
+from evaluation import evaluate_region, excel_chunks, render_charts
+
+# Rows per chunk when reading the new rows of an Excel file
+CHUNK_SIZE = 10000
+
+
+class LiveElection:
+    """
+    Keeps the encoded ballots of an input file that is still growing, e.g. an export that is refreshed
+    during the voting window, and recounts the provisional results from them.
+
+    Each update only parses the rows added since the previous one and merges their distinct ballots into
+    the encoded ballots of each region. CSV files are read from the byte offset where the previous update
+    stopped, so they have to be append-only; only complete lines are taken. Excel files have to be
+    unzipped as a whole, but the rows read before are skipped without being parsed.
+
+    The result tables are saved on every update with new ballots; the charts are rendered at most every
+    chart_interval seconds.
+
+    Args:
+    file_path (str): Path to the Excel (.xlsx) or CSV (.csv) file containing voting data.
+    store_path (str): Directory in which the output files are saved.
+    consider_invalid (bool): Flag to determine whether to consider invalid votes.
+    chart_interval (float): Minimum number of seconds between two renderings of the charts.
+    export (str): The format of the result tables, see run_instant_runoff ('workbook' is not supported).
+    aliases (dict, optional): Alternative spellings of candidate names, see CandidateRegistry.
+
+    Attributes:
+    encoders (dict): The BallotEncoder of each region.
+    rows (int): Number of input rows read so far.
+    """
+
+    def __init__(self, file_path, store_path, consider_invalid=False, chart_interval=60, export='xlsx',
+                 aliases=None):
+        if export not in ('xlsx', 'csv', 'parquet'):
+            raise ValueError(f"Unknown export format '{export}', expected 'xlsx', 'csv' or 'parquet'.")
+        self.file_path = file_path
+        self.store_path = store_path
+        self.consider_invalid = consider_invalid
+        self.chart_interval = chart_interval
+        self.export = export
+        self.aliases = aliases
+        self.encoders = {}
+        self.rows = 0
+        self.offset = 0  # Number of bytes of a CSV file read so far
+        self.charts = []  # Charts of the latest results that have not been rendered yet
+        self.last_render = None
+
+    def read_new_rows(self):
+        """
+        Reads the rows added to the input file since the rows counted so far. The read position is only
+        advanced by update, once the rows have been encoded.
+
+        Returns:
+        tuple: The new rows with the same columns as returned by input_excel, or None if there are none,
+               and the byte offset of a CSV file after them.
+        """
+        offset = self.offset
+        if self.file_path.lower().endswith('.csv'):
+            with open(self.file_path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+            # A line that is still being written is left for the next update
+            end = data.rfind(b'\n') + 1
+            if end == 0:
+                return None, offset
+            offset += end
+            chunk = pd.read_csv(io.BytesIO(data[:end]), header=None)
+        else:
+            chunks = [chunk[chunk.index >= self.rows] for chunk in excel_chunks(self.file_path, CHUNK_SIZE)
+                      if chunk.index[-1] >= self.rows]
+            if not chunks:
+                return None, offset
+            chunk = pd.concat(chunks)
+        if len(chunk) == 0:
+            return None, offset
+
+        column_names = ['Voter-ID', 'Region 1', 'Region 2']
+        if len(column_names) == chunk.shape[1]:
+            chunk.columns = column_names
+        return chunk, offset
+
+    def update(self, force_charts=False):
+        """
+        Reads the new rows, merges their ballots and recounts and saves the results of every region.
+
+        The rows are encoded into copies of the encoders, which only replace them once all regions have
+        been encoded. If parsing fails, the error is raised and the same rows are read again at the next
+        update, so no rows are lost or counted twice.
+
+        Args:
+        force_charts (bool): Flag to render the charts even if the chart interval has not passed.
+
+        Returns:
+        list of dicts: One summary per region as returned by evaluate_region, or an empty list if no
+                       rows were added.
+        """
+        try:
+            chunk, offset = self.read_new_rows()
+        except (OSError, zipfile.BadZipFile):
+            # The file is being rewritten; try again at the next update
+            return []
+
+        summaries = []
+        if chunk is not None:
+            encoders = {region: copy.deepcopy(encoder) for region, encoder in self.encoders.items()}
+            for region in chunk.columns[1:]:
+                encoders.setdefault(region, BallotEncoder(self.aliases)).add(chunk[region])
+            self.encoders = encoders
+            self.offset = offset
+            self.rows += len(chunk)
+
+            invalid_specifier = 'with_invalid' if self.consider_invalid else 'without_invalid'
+            self.charts = []
+            for region, encoder in self.encoders.items():
+                chart, summary = evaluate_region(region, encoder.finish(self.consider_invalid), self.store_path,
+                                                 invalid_specifier, render=False, export=self.export)
+                summary.pop('stages')
+                self.charts.append(chart)
+                summaries.append(summary)
+
+        self.render_due_charts(force_charts)
+        return summaries
+
+    def render_due_charts(self, force=False):
+        """
+        Renders the charts of the latest results if they have not been rendered yet and the chart
+        interval has passed since the previous rendering.
+
+        Args:
+        force (bool): Flag to render the charts even if the chart interval has not passed.
+        """
+        due = self.last_render is None or time.monotonic() - self.last_render >= self.chart_interval
+        if self.charts and (due or force):
+            render_charts(self.charts)
+            self.charts = []
+            self.last_render = time.monotonic()
+
+
+def watch(file_path, store_path, consider_invalid=False, poll_interval=5, chart_interval=60, export='xlsx',
+          aliases=None):
+    """
+    Watches a growing input file and refreshes the provisional results whenever rows are added,
+    until interrupted with Ctrl+C. A failed update is reported and retried at the next change of the file.
+
+    Args:
+    file_path (str): Path to the Excel (.xlsx) or CSV (.csv) file containing voting data.
+    store_path (str): Directory in which the output files are saved.
+    consider_invalid (bool): Flag to determine whether to consider invalid votes.
+    poll_interval (float): Number of seconds between two checks of the file.
+    chart_interval (float): Minimum number of seconds between two renderings of the charts.
+    export (str): The format of the result tables, see LiveElection.
+    aliases (dict, optional): Alternative spellings of candidate names, see CandidateRegistry.
+    """
+    os.makedirs(store_path, exist_ok=True)
+    election = LiveElection(file_path, store_path, consider_invalid, chart_interval, export, aliases)
+    last_change = None
+    try:
+        while True:
+            stat = os.stat(file_path)
+            if (stat.st_mtime, stat.st_size) != last_change:
+                last_change = stat.st_mtime, stat.st_size
+                try:
+                    summaries = election.update()
+                except Exception as error:
+                    print(f"{time.strftime('%H:%M:%S')} update failed, retrying at the next change: {error!r}",
+                          file=sys.stderr)
+                    summaries = []
+                for summary in summaries:
+                    print(f"{time.strftime('%H:%M:%S')} {summary['region']}: {summary['winner']} after "
+                          f"{summary['rounds']} rounds ({summary['valid votes']} valid votes, {election.rows} rows)")
+            else:
+                # Render the charts held back by the chart interval once it has passed
+                election.render_due_charts()
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        election.render_due_charts(force=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Count an election live while its input file grows.')
+    parser.add_argument('file_path', help='Excel file or append-only CSV file of the votes')
+    parser.add_argument('store_path', help='directory for the provisional results')
+    parser.add_argument('--consider-invalid', action='store_true', help='count the invalid votes')
+    parser.add_argument('--poll-interval', type=float, default=5, help='seconds between two checks of the file')
+    parser.add_argument('--chart-interval', type=float, default=60, help='minimum seconds between two chart renderings')
+    parser.add_argument('--export', choices=['xlsx', 'csv', 'parquet'], default='xlsx',
+                        help='format of the result tables')
+    parser.add_argument('--aliases', metavar='JSON_FILE',
+                        help='JSON object mapping alternative spellings of candidate names onto their canonical name')
+    args = parser.parse_args()
+
+    watch(args.file_path, args.store_path, args.consider_invalid, args.poll_interval, args.chart_interval, args.export,
+          load_aliases(args.aliases))
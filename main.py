@@ -1,5 +1,34 @@
-from evaluation import run_instant_runoff
+import argparse
+from candidate_registry import load_aliases
+from evaluation import run_instant_runoff, set_pandas_display_options
 
-file_path = 'YOUNGO_Votes_2024_GN.xlsx'
-store_path = '2024_GN'
-run_instant_runoff(file_path,store_path, consider_invalid=True)
\ No newline at end of file
+parser = argparse.ArgumentParser(description='Evaluate an election with Instant-Runoff Voting.')
+parser.add_argument('file_path', nargs='?', default='YOUNGO_Votes_2024_GN.xlsx')
+parser.add_argument('store_path', nargs='?', default='2024_GN')
+parser.add_argument('--no-plots', action='store_true', help='skip rendering the charts')
+parser.add_argument('--method', choices=['irv', 'stv', 'borda', 'schulze'], default='irv', help='counting method')
+parser.add_argument('--seats', type=int, default=1, help='number of seats to fill with STV')
+parser.add_argument('--robustness', type=int, metavar='REPLICATES', default=0,
+                    help='additionally estimate the win probabilities from this many resamples')
+parser.add_argument('--bulk-elimination', action='store_true',
+                    help='eliminate all candidates that can no longer win in one IRV round')
+parser.add_argument('--aliases', metavar='JSON_FILE',
+                    help='JSON object mapping alternative spellings of candidate names onto their canonical name')
+parser.add_argument('--export', choices=['xlsx', 'workbook', 'csv', 'parquet'], default='xlsx',
+                    help='format of the result tables')
+parser.add_argument('--verbose', action='store_true', help='print the time and memory of every stage')
+parser.add_argument('--trace-memory', action='store_true', help='also record the Python allocations of every stage')
+args = parser.parse_args()
+
+aliases = load_aliases(args.aliases)
+
+set_pandas_display_options()
+run_instant_runoff(args.file_path, args.store_path, consider_invalid=True, use_cache=True,
+                   plots='none' if args.no_plots else 'inline', method=args.method, seats=args.seats,
+                   verbose=args.verbose, trace_memory=args.trace_memory, export=args.export,
+                   elimination='bulk' if args.bulk_elimination else 'single', aliases=aliases)
+
+if args.robustness:
+    from robustness import run_robustness
+    run_robustness(args.file_path, args.store_path, consider_invalid=True, replicates=args.robustness,
+                   aliases=aliases)
@@ -0,0 +1,195 @@
+import numpy as np
+from candidate_registry import is_no_good
+from helper_functions import current_top_choices
+
+# Upper bound for the number of (ballot, candidate, candidate) cells compared at once
+MAX_PAIRWISE_CELLS = 2 ** 24
+
+
+def pairwise_preferences(ballots, n_candidates, weights=None):
+    """
+    Counts for every pair of candidates how many voters rank the first above the second. Candidates
+    missing from a ballot rank below all candidates on it and are tied with each other.
+
+    Args:
+    ballots (np.ndarray): Ballot matrix of candidate IDs, -1 for empty preference levels.
+    n_candidates (int): Number of candidate IDs.
+    weights (np.ndarray, optional): How often each row of ballots was cast, see ballot_patterns.
+
+    Returns:
+    np.ndarray: Matrix whose entry [i, j] is the number of voters preferring candidate i over candidate j.
+    """
+    n_ballots, width = ballots.shape
+    weights = np.ones(n_ballots) if weights is None else np.asarray(weights, dtype=float)
+
+    # Preference level of each candidate on each ballot; unranked candidates get the level after the last.
+    # A spare column takes the empty cells (-1), and a repeated name keeps its highest level.
+    levels = np.full((n_ballots, n_candidates + 1), width)
+    rows = np.repeat(np.arange(n_ballots), width)
+    np.minimum.at(levels, (rows, ballots.ravel()), np.tile(np.arange(width), n_ballots))
+    levels = levels[:, :n_candidates]
+
+    preferences = np.zeros((n_candidates, n_candidates))
+    batch_size = max(1, MAX_PAIRWISE_CELLS // max(n_candidates ** 2, 1))
+    for start in range(0, n_ballots, batch_size):
+        batch = levels[start:start + batch_size]
+        above = batch[:, :, None] < batch[:, None, :]
+        preferences += np.tensordot(weights[start:start + batch_size], above, axes=1)
+    return preferences
+
+
+def drop_no_good(ballots, candidates):
+    """
+    Removes 'no good candidate' from the ballots and the candidates, so it is never counted as a
+    candidate. The remaining candidates keep their order; ballots that rank nothing else become empty.
+
+    Args:
+    ballots (np.ndarray): Ballot matrix of candidate IDs, -1 for empty preference levels.
+    candidates (list): Candidate names indexed by their ID.
+
+    Returns:
+    tuple: A tuple containing the ballot matrix encoded over the remaining candidates (-1 where
+           'no good candidate' was ranked) and the names of the remaining candidates.
+    """
+    keep = np.array([not is_no_good(name) for name in candidates], dtype=bool)
+    # Map the old IDs onto the new ones; the spare last entry keeps the empty cells (-1) empty
+    ids = np.full(len(candidates) + 1, -1, dtype=np.int32)
+    ids[np.flatnonzero(keep)] = np.arange(keep.sum())
+    return ids[ballots], [name for name, kept in zip(candidates, keep) if kept]
+
+
+def borda_count(ballots, candidates, weights=None):
+    """
+    Conducts a Borda count. A candidate scores one point for every candidate ranked below it on a
+    ballot, with unranked candidates counting as ranked last, so the scores are the row sums of the
+    pairwise-preference matrix. 'no good candidate' is not scored, see drop_no_good.
+
+    Args:
+    ballots (np.ndarray): Ballot matrix of candidate IDs, -1 for empty preference levels.
+    candidates (list): Candidate names indexed by their ID.
+    weights (np.ndarray, optional): How often each row of ballots was cast, see ballot_patterns.
+
+    Returns:
+    tuple: A tuple containing the winner's name and a dictionary of Borda scores, highest first.
+    """
+    ballots, candidates = drop_no_good(ballots, candidates)
+    if len(candidates) == 0:
+        return "No winner found", {}
+
+    scores = pairwise_preferences(ballots, len(candidates), weights).sum(axis=1)
+    order = np.argsort(-scores, kind='stable')
+    return candidates[order[0]], {candidates[c]: float(scores[c]) for c in order}
+
+
+def schulze_method(ballots, candidates, weights=None):
+    """
+    Determines the Condorcet winner with the Schulze method (strongest paths over the pairwise defeats).
+    'no good candidate' is left out of the count, see drop_no_good.
+
+    Args:
+    ballots (np.ndarray): Ballot matrix of candidate IDs, -1 for empty preference levels.
+    candidates (list): Candidate names indexed by their ID.
+    weights (np.ndarray, optional): How often each row of ballots was cast, see ballot_patterns.
+
+    Returns:
+    tuple: A tuple containing the winner's name, the candidate names ranked by the number of candidates
+           they beat on strongest paths, the pairwise-preference matrix and the strongest-path matrix.
+           The matrices are indexed like the candidates without 'no good candidate'.
+    """
+    ballots, candidates = drop_no_good(ballots, candidates)
+    n_candidates = len(candidates)
+    if n_candidates == 0:
+        return "No winner found", [], np.zeros((0, 0)), np.zeros((0, 0))
+
+    preferences = pairwise_preferences(ballots, n_candidates, weights)
+
+    # Widest paths (Floyd-Warshall), starting from the pairwise defeats
+    paths = np.where(preferences > preferences.T, preferences, 0)
+    for k in range(n_candidates):
+        paths = np.maximum(paths, np.minimum(paths[:, k:k + 1], paths[k:k + 1, :]))
+        np.fill_diagonal(paths, 0)
+
+    # A candidate beats another if its strongest path to it is stronger than the reverse one. There is
+    # always at least one candidate that is not beaten by anyone; ties go to the lowest candidate ID.
+    beats = (paths > paths.T).sum(axis=1)
+    order = np.argsort(-beats, kind='stable')
+    ranking = [candidates[c] for c in order]
+    unbeaten = (paths >= paths.T).all(axis=1)
+    winner = candidates[np.flatnonzero(unbeaten)[0]]
+    return winner, ranking, preferences, paths
+
+
+def single_transferable_vote(ballots, candidates, seats, weights=None, progress=None):
+    """
+    Conducts a Single Transferable Vote (STV) election with the Droop quota and fractional surplus
+    transfers: the surplus of an elected candidate is passed on by reducing the value of every ballot
+    counting for it by the same factor (Gregory method). Ties are broken like in instant_runoff_tally,
+    by the first ballot counting for each candidate. 'no good candidate' cannot be elected: it is
+    excluded from the start, so ballots that rank nothing else after it are exhausted.
+
+    Args:
+    ballots (np.ndarray): Ballot matrix of candidate IDs, -1 for empty preference levels.
+    candidates (list): Candidate names indexed by their ID.
+    seats (int): Number of seats to fill.
+    weights (np.ndarray, optional): How often each row of ballots was cast, see ballot_patterns.
+    progress (callable, optional): Called as progress('round', message) after every counting round.
+
+    Returns:
+    tuple: A tuple containing the names of the elected candidates in order of election, detailed
+           information about each round and the total number of rounds conducted.
+    """
+    if seats < 1:
+        raise ValueError(f'Invalid number of seats {seats}, expected at least 1.')
+    n_ballots = len(ballots)
+    n_candidates = len(candidates)
+    values = np.ones(n_ballots) if weights is None else np.asarray(weights, dtype=float)
+
+    # Elected or eliminated candidates, and 'no good candidate'
+    excluded = np.array([is_no_good(name) for name in candidates], dtype=bool)
+    # The quota is based on the ballots that rank at least one candidate; the spare entry skips empty cells
+    ranks_candidate = (~np.append(excluded, True)[ballots]).any(axis=1)
+    quota = np.floor(values[ranks_candidate].sum() / (seats + 1)) + 1
+
+    elected = []
+    rounds_info = []
+    round_number = 0
+
+    while len(elected) < seats and not excluded.all():
+        round_number += 1
+        _, top = current_top_choices(ballots, excluded)
+        counted = np.flatnonzero(top >= 0)
+        # Round the fractional votes, so that ties do not depend on the order of the summation
+        counts = np.bincount(top[counted], values[counted], minlength=n_candidates).round(6)
+        first_seen = np.full(n_candidates, n_ballots)
+        np.minimum.at(first_seen, top[counted], counted)
+
+        # Order the remaining candidates by votes, ties by first appearance
+        hopeful = np.flatnonzero(~excluded)
+        hopeful = hopeful[np.argsort(first_seen[hopeful], kind='stable')]
+        hopeful = hopeful[np.argsort(-counts[hopeful], kind='stable')]
+
+        votes = {candidates[c]: float(counts[c]) for c in hopeful}
+        rounds_info.append({'Round': round_number, 'Votes': votes, 'Eliminated': 'None', 'Elected': 'None'})
+        if progress is not None:
+            progress('round', f'round {round_number} of at most {n_candidates}')
+
+        if len(hopeful) <= seats - len(elected):
+            # Every remaining candidate gets one of the remaining seats
+            elected.extend(candidates[c] for c in hopeful)
+            rounds_info[-1]['Elected'] = ', '.join(candidates[c] for c in hopeful)
+            break
+
+        if counts[hopeful[0]] >= quota:
+            # Elect the candidate with the most votes and transfer the surplus at a reduced value
+            winner = hopeful[0]
+            elected.append(candidates[winner])
+            rounds_info[-1]['Elected'] = candidates[winner]
+            values[top == winner] *= (counts[winner] - quota) / counts[winner]
+            excluded[winner] = True
+        else:
+            # Eliminate the candidate with the fewest votes and transfer its ballots at their full value
+            loser = hopeful[np.argmin(counts[hopeful])]
+            rounds_info[-1]['Eliminated'] = candidates[loser]
+            excluded[loser] = True
+
+    return elected, rounds_info, round_number
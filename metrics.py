@@ -0,0 +1,96 @@
+import json
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of the current process in MB, or None where it cannot be measured.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+class RunMetrics:
+    """
+    Records the wall time, memory and row count of each stage of an evaluation.
+
+    Stages are recorded as laps: each call to lap() closes the stage that started at the previous lap
+    (or at creation). The stages are 'read', 'clean', 'validate', 'cache', 'round', 'count', 'save'
+    and 'plot'.
+
+    Args:
+    trace_memory (bool): Flag to also record the peak memory allocated by Python per stage with
+                         tracemalloc, which makes the evaluation noticeably slower.
+
+    Attributes:
+    stages (list of dicts): One record per stage with its name, region, seconds, rows and memory peaks.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+        self.stages = []
+        self.start = self.last = time.perf_counter()
+
+    def lap(self, stage, region=None, rows=None):
+        """
+        Records the stage that ends now.
+
+        Args:
+        stage (str): Name of the stage.
+        region (str, optional): The region the stage belongs to.
+        rows (int, optional): Number of rows or ballots the stage processed.
+        """
+        now = time.perf_counter()
+        record = {'stage': stage, 'region': region, 'seconds': now - self.last, 'rows': rows,
+                  'peak_rss_mb': peak_rss_mb()}
+        if self.trace_memory:
+            record['peak_traced_mb'] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.reset_peak()
+        self.stages.append(record)
+        self.last = now
+
+    def stop(self):
+        """
+        Stops tracing memory allocations if this object started it.
+        """
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def write(self, path, **info):
+        """
+        Writes the recorded stages as JSON.
+
+        Args:
+        path (str): The file path, usually 'run_metrics.json' in the output directory.
+        info: Further fields to store, e.g. the input file and the options of the run.
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({**info, 'total_seconds': time.perf_counter() - self.start, 'stages': self.stages}, f, indent=2)
+
+    def format_table(self):
+        """
+        Formats the recorded stages as a text table.
+        """
+        lines = [f'{"stage":10s} {"region":24s} {"seconds":>9s} {"rows":>9s} {"peak RSS MB":>12s}']
+        for record in self.stages:
+            rows = '' if record['rows'] is None else str(record['rows'])
+            rss = '' if record['peak_rss_mb'] is None else f'{record["peak_rss_mb"]:.1f}'
+            lines.append(f'{record["stage"]:10s} {str(record["region"] or ""):24s} {record["seconds"]:9.4f} '
+                         f'{rows:>9s} {rss:>12s}')
+        return '\n'.join(lines)
@@ -0,0 +1,183 @@
+import matplotlib
+# Render to files only; the Agg backend needs no GUI toolkit and is safe to use in worker processes
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+
+def plot_instant_runoff_results(rounds,store_path, region, invalid_specifier):
+    """
+    Generates visualizations for Instant-Runoff Voting results, including a horizontal stacked bar chart
+    and a series of pie charts for each round of voting.
+
+    Args:
+    rounds (RoundResults): The vote counts and eliminated candidates of each round.
+    region (str): The name of the region, used for labeling the output files.
+    """
+
+    # Take the round table for easy plotting
+    rounds_df = rounds.frame()
+    rounds_df.fillna(0, inplace=True)  # Replace NaN with 0 for plotting
+
+    # Set up the plot parameters
+    num_rounds = len(rounds_df)
+    candidates = rounds_df.columns
+    colors = plt.cm.viridis_r(np.linspace(0, 1, len(candidates)))  # Assign colors to candidates
+
+    # Create a horizontal stacked bar chart on a single figure that is closed once it is saved
+    fig, ax = plt.subplots()
+    rounds_df.plot(kind='barh', stacked=True, color=colors, legend=False, ax=ax)
+    plt.title(f'Considered Votes per Candidate per Counting Round in {region}')
+    plt.ylabel('Counting')
+    plt.xlabel('Number of Votes')
+
+
+    # Draw a dashed line indicating the 50% vote threshold
+    '''If accounting for invalid votes, this threhsold might change, because some voters might only have voted for 
+    one eliminated candidate and thus have no vote regarding the remaining set of candidates'''
+
+    half_votes = rounds_df.sum(axis=1) * 0.5
+    for i in half_votes.index:
+        label = '50% (required simple majority)' if i == 0 else None
+        plt.plot([half_votes[i],half_votes[i]],[i-0.5,i+0.5],color='grey', linestyle='--', label=label, alpha=0.7)
+
+    # Position the legend outside the plot
+    plt.yticks(range(num_rounds), ['Round ' + str(i + 1) for i in range(num_rounds)], rotation=0)
+
+    plt.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=2)
+    plt.tight_layout()
+    plt.savefig(f'{store_path}/{region}_Votes_BarChart_{invalid_specifier}.png')
+    plt.close(fig)
+
+    # # Set up a grid of subplots for pie charts
+    # cols = 3  # Max number of columns
+    # rows = math.ceil(num_rounds / cols)  # Calculate the number of rows needed
+    # fig, axes = plt.subplots(rows, cols, figsize=(15, 6 * rows))
+    # axes = axes.flatten()  # Flatten axes for easy iteration
+    #
+    # # Create a pie chart for each round
+    # for i in range(num_rounds):
+    #     round_data = rounds_df.iloc[i]
+    #     round_data = round_data[round_data > 0]  # Exclude candidates with 0 votes
+    #     axes[i].pie(round_data, labels=None, autopct='%1.1f%%', colors=colors, startangle=140)
+    #     axes[i].set_title(f'Round {i + 1}')
+    #
+    # # Hide any unused subplots
+    # for j in range(i + 1, len(axes)):
+    #     axes[j].axis('off')
+    #
+    # # Create a legend for the pie charts
+    # fig.legend(rounds_df.columns, title='Candidates', loc='center left', bbox_to_anchor=(1, 0.5))
+    #
+    # plt.suptitle(f'Vote Share per Round in {region}')
+    # plt.subplots_adjust(right=0.7)
+    # plt.tight_layout()
+    # fig.savefig(f'{store_path}/{region}_Votes_PieCharts_{invalid_specifier}.png')
+
+def plot_test_eligibility(vote_dict,store_path, region, invalid_specifier):
+    """
+    Generates a pie chart visualization for vote categories in a specified region.
+
+    Args:
+    vote_dict (dict): A dictionary with keys as vote categories and values as their counts.
+    region (str): The name of the region for which the pie chart is generated.
+
+    The function saves the generated pie chart as a PNG file.
+    """
+
+    # Assign different colors for each vote category
+    colors = plt.cm.viridis_r(np.linspace(0, 1, len(vote_dict.keys())))
+
+    # Create a DataFrame from the vote dictionary for easy plotting
+    chart_df = pd.DataFrame(vote_dict, index=[0])
+
+    # Create a figure for the pie chart
+    fig = plt.figure()
+    # Generate the pie chart using the flattened values of the DataFrame
+    plt.pie(chart_df.values.flatten(), colors=colors, labels=chart_df.columns, autopct='%1.1f%%', startangle=140)
+    # Set the title of the pie chart including the total number of votes
+    plt.title(f"Vote Validity in {region} ({chart_df.values.flatten().sum()})")
+    plt.tight_layout()
+
+    # Save the pie chart as a PNG file
+    plt.savefig(f'{store_path}/{region}_Validity_Votes_PieCharts_{invalid_specifier}.png')
+    plt.close(fig)
+
+
+def plot_transfers(rounds, store_path, region, invalid_specifier):
+    """
+    Generates a Sankey-style chart of an Instant-Runoff Voting count: one stacked column of votes per round,
+    with bands showing where the ballots of the eliminated candidates went and which ones were exhausted.
+    The transfers of candidates eliminated together are split between their segments in order.
+
+    Args:
+    rounds (RoundResults): The rounds as returned by instant_runoff_tally.
+    store_path (str): Directory in which the chart is saved.
+    region (str): The name of the region, used for labeling the output files.
+    invalid_specifier (str): 'with_invalid' or 'without_invalid', used for labeling the output files.
+    """
+    # Votes and transfers per round, with the candidates in the column order of the round table
+    columns = rounds.columns()
+    votes = rounds.votes[:, columns]
+    transfers = rounds.transfers()[:, columns]
+    eliminated = rounds.eliminated[columns]
+    candidates = [rounds.candidates[c] for c in columns]
+    colors = plt.cm.viridis_r(np.linspace(0, 1, len(candidates)))
+    width = 0.25
+    n_rounds = len(rounds)
+
+    # Bottom of each candidate's segment per round; the exhausted ballots are stacked on top
+    bottoms = np.cumsum(votes, axis=1) - votes
+    totals = votes.sum(axis=1)
+    exhausted = np.concatenate([[0], np.cumsum(rounds.exhausted)[:-1]])
+
+    def band(x0, low0, high0, low1, high1, color):
+        # A smooth band from the right edge of one column to the left edge of the next
+        x = np.linspace(x0 + width / 2, x0 + 1 - width / 2, 50)
+        t = (1 - np.cos(np.linspace(0, np.pi, 50))) / 2
+        ax.fill_between(x, low0 + (low1 - low0) * t, high0 + (high1 - high0) * t, color=color, alpha=0.4, linewidth=0)
+
+    fig, ax = plt.subplots(figsize=(max(6, 1.5 * n_rounds), 6))
+    for i in range(n_rounds):
+        for j in np.flatnonzero(votes[i]):
+            ax.bar(i, votes[i, j], width, bottom=bottoms[i, j], color=colors[j])
+        if exhausted[i] > 0:
+            ax.bar(i, exhausted[i], width, bottom=totals[i], color='lightgrey')
+        if i + 1 == n_rounds:
+            break
+
+        # Remaining candidates keep their ballots; the eliminated candidates' ballots are stacked on top of them
+        out = np.flatnonzero(eliminated == i)
+        for j in np.flatnonzero((votes[i] > 0) & (eliminated != i)):
+            band(i, bottoms[i, j], bottoms[i, j] + votes[i, j], bottoms[i + 1, j], bottoms[i + 1, j] + votes[i, j],
+                 colors[j])
+        if exhausted[i] > 0:
+            band(i, totals[i], totals[i] + exhausted[i], totals[i + 1], totals[i + 1] + exhausted[i], 'lightgrey')
+
+        # Targets of the transferred ballots, filled from the segments of the eliminated candidates in turn
+        targets = [(bottoms[i + 1, j] + votes[i, j], transfers[i, j]) for j in np.flatnonzero(transfers[i])]
+        if rounds.exhausted[i] > 0:
+            targets.append((totals[i + 1] + exhausted[i], rounds.exhausted[i]))
+        sources = [[bottoms[i, j], votes[i, j], colors[j]] for j in out[::-1]]
+        for end, amount in targets:
+            while amount > 0 and sources:
+                start, available, color = sources[0]
+                share = min(amount, available)
+                band(i, start, start + share, end, end + share, color)
+                sources[0][0] += share
+                sources[0][1] -= share
+                if sources[0][1] <= 0:
+                    sources.pop(0)
+                end += share
+                amount -= share
+
+    handles = [plt.Rectangle((0, 0), 1, 1, color=color) for color in colors]
+    handles.append(plt.Rectangle((0, 0), 1, 1, color='lightgrey'))
+    ax.legend(handles, candidates + ['Exhausted'], loc='upper center', bbox_to_anchor=(0.5, -0.1), ncol=3)
+    ax.set_xticks(range(n_rounds), ['Round ' + str(i + 1) for i in range(n_rounds)])
+    ax.set_ylabel('Number of Votes')
+    ax.set_title(f'Transfers of Votes per Counting Round in {region}')
+    plt.tight_layout()
+    plt.savefig(f'{store_path}/{region}_Transfers_Sankey_{invalid_specifier}.png')
+    plt.close(fig)
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from evaluation import load_region_ballots
+from helper_functions import ballot_patterns, save_excel
+from tally import BatchTally
+
+# Upper bound for the number of (replicate, pattern, preference level) cells tallied at once
+MAX_BATCH_CELLS = 2 ** 24
+
+
+def batch_instant_runoff(patterns, weights, n_candidates):
+    """
+    Conducts Instant-Runoff Voting for many weightings of the same ballot patterns at once, with the
+    same rules and tie-breaking as instant_runoff_tally.
+
+    Args:
+    patterns (np.ndarray): Distinct ballots as returned by ballot_patterns.
+    weights (np.ndarray): Number of ballots per pattern, one row per replicate.
+    n_candidates (int): Number of candidate IDs.
+
+    Returns:
+    tuple: A tuple containing the winner ID per replicate (-1 if no winner was found) and the
+           eliminated candidate IDs per replicate in order of elimination (padded with -1).
+    """
+    tally = BatchTally(patterns, weights, n_candidates)
+    n_replicates = len(tally.weights)
+    winners = np.full(n_replicates, -1)
+    eliminations = np.full((n_replicates, n_candidates), -1)
+    active = np.ones(n_replicates, dtype=bool)
+    replicates = np.arange(n_replicates)
+
+    for round_index in range(n_candidates):
+        counts = tally.counts
+        present = counts > 0
+        # Replicates without any counted ballot end without a winner
+        active &= present.any(axis=1)
+        if not active.any():
+            break
+
+        # The leader has the most votes and the loser the fewest; ties go to the first appearance
+        unranked = len(patterns)
+        most = counts.max(axis=1, keepdims=True)
+        fewest = np.where(present, counts, np.inf).min(axis=1, keepdims=True)
+        leader = np.where(present & (counts == most), tally.first_seen, unranked).argmin(axis=1)
+        loser = np.where(present & (counts == fewest), tally.first_seen, unranked).argmin(axis=1)
+
+        # Check if a candidate has more than 50% of the votes
+        won = active & (counts[replicates, leader] / np.maximum(counts.sum(axis=1), 1) > 0.5)
+        winners[won] = leader[won]
+        active &= ~won
+
+        eliminations[active, round_index] = loser[active]
+        tally.eliminate(np.where(active, loser, -1))
+
+    return winners, eliminations
+
+
+def resample_weights(counts, replicates, drop_fraction=None, rng=None):
+    """
+    Draws resampled ballot sets as weights over the ballot patterns.
+
+    Args:
+    counts (np.ndarray): Number of ballots per pattern as returned by ballot_patterns.
+    replicates (int): Number of resampled ballot sets.
+    drop_fraction (float, optional): If set, each replicate drops this share of the ballots at random
+                                     (without replacement); otherwise the ballots are bootstrapped.
+    rng (np.random.Generator, optional): The random number generator.
+
+    Returns:
+    np.ndarray: The number of ballots per pattern, one row per replicate.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    n_ballots = int(counts.sum())
+    if drop_fraction is None:
+        return rng.multinomial(n_ballots, counts / n_ballots, size=replicates)
+    kept = n_ballots - int(round(n_ballots * drop_fraction))
+    return rng.multivariate_hypergeometric(counts, kept, size=replicates)
+
+
+def robustness_analysis(ballots, candidates, replicates=1000, drop_fractions=(), seed=None, weights=None):
+    """
+    Estimates how stable the IRV outcome is by re-running it on bootstrap resamples of the ballots and
+    on ballot sets with a share of the ballots dropped.
+
+    The ballots are reduced to their distinct patterns once, and every resample is a weight vector
+    over these patterns, so the replicates are tallied in batches with NumPy.
+
+    Args:
+    ballots (np.ndarray): Ballot matrix of candidate IDs, -1 for empty preference levels.
+    candidates (list): Candidate names indexed by their ID.
+    replicates (int): Number of resamples per resampling scheme.
+    drop_fractions (iterable of floats): Shares of ballots to drop, e.g. (0.05, 0.1), each evaluated in
+                                         addition to the bootstrap.
+    seed (int, optional): Seed for reproducible resamples.
+    weights (np.ndarray, optional): How often each row of ballots was cast, if the rows are distinct patterns.
+
+    Returns:
+    tuple: A tuple containing a DataFrame with the probability of each candidate winning (one column per
+           resampling scheme) and a DataFrame with the probability of each elimination order.
+    """
+    rng = np.random.default_rng(seed)
+    patterns, counts, _ = ballot_patterns(np.asarray(ballots), weights)
+    names = np.array(list(candidates) + ['No winner found'], dtype=object)
+
+    wins = {}
+    orders = []
+    schemes = [('bootstrap', None)] + [(f'drop {fraction:.0%}', fraction) for fraction in drop_fractions]
+    for scheme, drop_fraction in schemes:
+        if len(patterns) == 0:
+            wins[scheme] = pd.Series(1.0, index=['No winner found'])
+            continue
+
+        # Bound the memory of a batch by the size of the (replicate, pattern, level) arrays
+        batch_size = max(1, MAX_BATCH_CELLS // (len(patterns) * max(patterns.shape[1], 1)))
+        winners, eliminations = [], []
+        for start in range(0, replicates, batch_size):
+            weights = resample_weights(counts, min(batch_size, replicates - start), drop_fraction, rng)
+            batch_winners, batch_eliminations = batch_instant_runoff(patterns, weights, len(candidates))
+            winners.append(batch_winners)
+            eliminations.append(batch_eliminations)
+        winners = np.concatenate(winners)
+        eliminations = np.concatenate(eliminations)
+
+        # Count the winners and the distinct elimination orders
+        winner_ids, winner_counts = np.unique(winners, return_counts=True)
+        wins[scheme] = pd.Series(winner_counts / replicates, index=names[winner_ids])
+
+        # Most likely orders first
+        order_ids, order_counts = np.unique(eliminations, axis=0, return_counts=True)
+        most_likely = np.argsort(-order_counts, kind='stable')
+        for order, count in zip(order_ids[most_likely], order_counts[most_likely]):
+            orders.append({'Resampling': scheme,
+                           'Elimination order': ' > '.join(candidates[c] for c in order if c >= 0),
+                           'Probability': count / replicates})
+
+    win_probabilities = pd.DataFrame(wins).fillna(0.0)
+    win_probabilities = win_probabilities.sort_values(list(wins), ascending=False)
+    order_probabilities = pd.DataFrame(orders, columns=['Resampling', 'Elimination order', 'Probability'])
+    return win_probabilities, order_probabilities
+
+
+def run_robustness(file_path, store_path, consider_invalid=False, replicates=1000, drop_fractions=(0.05, 0.1),
+                   seed=0, aliases=None):
+    """
+    Runs the robustness analysis for every region of an input file and saves the probabilities as Excel files.
+
+    Args:
+    file_path (str): Path to the Excel file containing voting data.
+    store_path (str): Directory in which the output files are saved.
+    consider_invalid (bool): Flag to determine whether to consider invalid votes.
+    replicates (int): Number of resamples per resampling scheme.
+    drop_fractions (iterable of floats): Shares of ballots to drop in addition to the bootstrap.
+    seed (int, optional): Seed for reproducible resamples.
+    aliases (dict, optional): Alternative spellings of candidate names, see CandidateRegistry.
+    """
+    invalid_specifier = 'with_invalid' if consider_invalid else 'without_invalid'
+    region_ballots = load_region_ballots(file_path, consider_invalid, aliases=aliases)
+    for region, (ballots, candidates, _, _, _, weights, _, _) in region_ballots.items():
+        win_probabilities, order_probabilities = robustness_analysis(ballots, candidates, replicates,
+                                                                     drop_fractions, seed, weights)
+        save_excel(win_probabilities, f'{store_path}/{region}_win_probability{invalid_specifier}.xlsx')
+        save_excel(order_probabilities, f'{store_path}/{region}_elimination_orders{invalid_specifier}.xlsx')
@@ -0,0 +1,144 @@
+import numpy as np
+
+
+class RoundResults:
+    """
+    The rounds of an Instant-Runoff Voting count, held in arrays over the candidate index instead of one
+    dict per round. Every round eliminates at least one candidate or ends the count, so the arrays are
+    allocated once for at most one round per candidate.
+
+    The arrays are exposed as views of the counted rounds; frame() builds the round table for export and
+    plotting in one step, and as_dicts() yields the rounds in the former rounds_info format.
+
+    Args:
+    candidates (list): Candidate names indexed by their ID.
+
+    Attributes:
+    candidates (list): Candidate names indexed by their ID.
+    eliminated (np.ndarray): Index of the round in which each candidate was eliminated, -1 if it was not.
+    """
+    __slots__ = ('candidates', 'eliminated', '_votes', '_order', '_exhausted', '_rounds')
+
+    def __init__(self, candidates):
+        n_candidates = len(candidates)
+        self.candidates = list(candidates)
+        self.eliminated = np.full(n_candidates, -1)
+        self._votes = np.zeros((n_candidates, n_candidates), dtype=np.int64)
+        self._order = np.full((n_candidates, n_candidates), -1, dtype=np.int32)  # Candidates by votes per round
+        self._exhausted = np.zeros(n_candidates, dtype=np.int64)
+        self._rounds = 0
+
+    def __len__(self):
+        return self._rounds
+
+    @property
+    def votes(self):
+        """
+        np.ndarray: Votes of each candidate ID per round (rounds x candidates), 0 once eliminated.
+        """
+        return self._votes[:self._rounds]
+
+    @property
+    def order(self):
+        """
+        np.ndarray: The IDs of the candidates with votes per round, most votes first, padded with -1.
+        """
+        return self._order[:self._rounds]
+
+    @property
+    def exhausted(self):
+        """
+        np.ndarray: Number of ballots per round that ranked none of the remaining candidates after its eliminations.
+        """
+        return self._exhausted[:self._rounds]
+
+    def add_round(self, counts, present):
+        """
+        Records the votes of a new round.
+
+        Args:
+        counts (np.ndarray): Votes of each candidate ID.
+        present (np.ndarray): IDs of the candidates with votes, most votes first.
+        """
+        self._votes[self._rounds] = counts
+        self._order[self._rounds, :len(present)] = present
+        self._rounds += 1
+
+    def eliminate(self, candidates, exhausted):
+        """
+        Records the candidates eliminated in the latest round.
+
+        Args:
+        candidates (np.ndarray): IDs of the eliminated candidates.
+        exhausted (int): Number of their ballots that ranked none of the remaining candidates.
+        """
+        self.eliminated[candidates] = self._rounds - 1
+        self._exhausted[self._rounds - 1] = exhausted
+
+    def eliminated_in(self, round_index):
+        """
+        Returns the names of the candidates eliminated in a round, fewest votes first.
+        """
+        order = self._order[round_index][::-1]
+        return [self.candidates[c] for c in order if c >= 0 and self.eliminated[c] == round_index]
+
+    def transfers(self):
+        """
+        Derives the number of ballots transferred to each candidate in each round from the votes of the next
+        round: only the ballots of the eliminated candidates move, so every increase is a transfer.
+
+        Returns:
+        np.ndarray: Transferred ballots per round and candidate ID (rounds x candidates).
+        """
+        rounds = np.arange(self._rounds)
+        following = np.zeros_like(self.votes)
+        following[:-1] = self.votes[1:]
+        transfers = following - self.votes
+        # Eliminated candidates receive nothing, and rounds without eliminations transfer nothing
+        transfers[(self.eliminated >= 0) & (self.eliminated <= rounds[:, None])] = 0
+        transfers[~np.isin(rounds, self.eliminated)] = 0
+        return transfers
+
+    def columns(self):
+        """
+        Returns the candidate IDs in the order the round table lists them: by the votes of the first round,
+        followed by candidates that only receive votes in later rounds.
+        """
+        order = self.order.ravel()
+        order = order[order >= 0]
+        _, first = np.unique(order, return_index=True)
+        return order[np.sort(first)]
+
+    def frame(self):
+        """
+        Builds the round table with one row per round and one column per candidate, empty where a
+        candidate has no votes.
+
+        Returns:
+        pd.DataFrame: The votes per round.
+        """
+        import pandas as pd
+
+        columns = self.columns()
+        votes = self.votes[:, columns]
+        return pd.DataFrame(votes, columns=[self.candidates[c] for c in columns]).where(votes > 0)
+
+    def as_dicts(self):
+        """
+        Yields the rounds in the former rounds_info format, e.g. for JSON output.
+
+        Yields:
+        dict: The round number, the votes, the eliminated candidates ('Eliminated' joined by ', ' and
+              'Eliminated candidates'), the transferred ballots ('Transfers') and the exhausted ballots.
+        """
+        transfers = self.transfers()
+        for i in range(self._rounds):
+            eliminated = self.eliminated_in(i)
+            yield {
+                'Round': i + 1,
+                'Votes': {self.candidates[c]: int(self._votes[i, c]) for c in self._order[i] if c >= 0},
+                'Eliminated': ', '.join(eliminated) if eliminated else 'None',
+                'Eliminated candidates': eliminated,
+                'Transfers': {self.candidates[c]: int(transfers[i, c]) for c in np.flatnonzero(transfers[i])},
+                'Exhausted': int(self._exhausted[i]),
+            }
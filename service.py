@@ -0,0 +1,379 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Kinds of charts served as PNG, with the file name pattern the plotting functions save them as
+CHART_FILES = {
+    'validity': '{region}_Validity_Votes_PieCharts_{invalid_specifier}.png',
+    'votes': '{region}_Votes_BarChart_{invalid_specifier}.png',
+    'transfers': '{region}_Transfers_Sankey_{invalid_specifier}.png',
+}
+
+# Rows per chunk when reading an input file; streaming reads both Excel and CSV files
+CHUNK_SIZE = 10000
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                500: 'Internal Server Error'}
+
+
+class ServiceError(Exception):
+    """
+    Raised while handling a request to answer it with an HTTP error status.
+
+    Args:
+    status (int): The HTTP status code.
+    message (str): The error message returned to the client.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def load_election(file_path, aliases=None):
+    """
+    Reads and encodes the ballots of every region of an input file for both invalid-vote variants.
+    Runs in a pool worker.
+
+    Args:
+    file_path (str): Path to the Excel or CSV file containing voting data.
+    aliases (dict, optional): Alternative spellings of candidate names, see CandidateRegistry.
+
+    Returns:
+    dict: Maps 'with_invalid' and 'without_invalid' to a dictionary mapping each region to its ballots,
+          as returned by load_region_ballots. The region names are strings, like the URL segments they
+          are looked up by, also for files whose columns are numbered.
+    """
+    from evaluation import encode_regions
+
+    encoders = encode_regions(file_path, CHUNK_SIZE, aliases=aliases)
+    return {invalid_specifier: {str(region): encoder.finish(variant) for region, encoder in encoders.items()}
+            for variant, invalid_specifier in ((True, 'with_invalid'), (False, 'without_invalid'))}
+
+
+def count_region(region_ballots, method='irv', seats=1, elimination='single'):
+    """
+    Counts the ballots of one region like evaluate_region, without saving anything. Runs in a pool worker.
+
+    Args:
+    region_ballots (tuple): The ballots of the region, as returned by load_region_ballots.
+    method (str): The counting method, see run_instant_runoff.
+    seats (int): Number of seats to fill with 'stv'.
+    elimination (str): 'single' or 'bulk', see instant_runoff_tally.
+
+    Returns:
+    dict: The winner, the number of rounds, the vote counts and the rounds ('rounds_info', a RoundResults
+          for 'irv'), Borda scores ('scores') or Schulze ranking ('ranking') of the method.
+    """
+    from evaluation import instant_runoff_tally
+    from methods import borda_count, schulze_method, single_transferable_vote
+
+    ballots, candidates, all_votes, no_good_candidate_count, invalid_votes, weights, _, _ = region_ballots
+    result = {
+        'method': method,
+        'valid votes': all_votes - no_good_candidate_count - invalid_votes,
+        'no good candidates': no_good_candidate_count,
+        'invalid votes': invalid_votes,
+        'rounds': None,
+    }
+    if method == 'irv':
+        result['winner'], result['rounds_info'], result['rounds'] = instant_runoff_tally(
+            ballots, candidates, weights=weights, elimination=elimination)
+    elif method == 'stv':
+        elected, result['rounds_info'], result['rounds'] = single_transferable_vote(ballots, candidates, seats, weights)
+        result['winner'] = ', '.join(elected) if elected else "No winner found"
+    elif method == 'borda':
+        result['winner'], result['scores'] = borda_count(ballots, candidates, weights)
+    else:
+        result['winner'], result['ranking'], _, _ = schulze_method(ballots, candidates, weights)
+    return result
+
+
+def chart_png(region, result, invalid_specifier, kind):
+    """
+    Renders one chart of a counted region and returns it as PNG bytes. Runs in a pool worker.
+
+    Args:
+    region (str): The name of the region.
+    result (dict): The counted region as returned by count_region.
+    invalid_specifier (str): 'with_invalid' or 'without_invalid'.
+    kind (str): 'validity', 'votes' or 'transfers' (the last two only for 'irv').
+
+    Returns:
+    bytes: The PNG image.
+    """
+    from plotting import plot_instant_runoff_results, plot_test_eligibility, plot_transfers
+
+    with tempfile.TemporaryDirectory() as store_path:
+        if kind == 'validity':
+            vote_dict = {f'{category} ({result[category]})': result[category]
+                         for category in ('valid votes', 'no good candidates', 'invalid votes')}
+            plot_test_eligibility(vote_dict, store_path, region, invalid_specifier)
+        elif kind == 'votes':
+            plot_instant_runoff_results(result['rounds_info'], store_path, region, invalid_specifier)
+        else:
+            plot_transfers(result['rounds_info'], store_path, region, invalid_specifier)
+        with open(os.path.join(store_path, CHART_FILES[kind].format(region=region, invalid_specifier=invalid_specifier)),
+                  'rb') as f:
+            return f.read()
+
+
+def to_json(value):
+    """
+    Converts the numpy values left in a result (e.g. candidate names or counts) for json.dumps.
+    """
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class ResultsService:
+    """
+    A local HTTP/JSON service that keeps elections loaded as encoded ballots, so that results are
+    answered without parsing the input files again. Counting and rendering run in a process pool,
+    which keeps pandas, numpy and matplotlib imported between requests, and every count and chart
+    is cached by the content hash of the election and the options of the request.
+
+    Endpoints:
+    GET  /elections                                       The loaded elections.
+    POST /elections  {"file": path, "aliases": {...}}     Loads an input file, optionally with other aliases
+                                                          than the service's; returns its id and regions.
+    GET  /elections/{id}/results                          The summary of every region.
+    GET  /elections/{id}/regions/{region}/rounds          The counted rounds of one region.
+    GET  /elections/{id}/regions/{region}/chart.png       A chart of one region (?chart=validity, votes
+                                                          or transfers).
+
+    The results, rounds and chart endpoints take the options ?invalid=with|without, method=irv|stv|borda|schulze,
+    seats=N and elimination=single|bulk.
+
+    Args:
+    workers (int, optional): Number of worker processes; defaults to the number of CPUs.
+    aliases (dict, optional): Alternative spellings of candidate names the files are loaded with by default,
+                              see CandidateRegistry.
+    """
+
+    def __init__(self, workers=None, aliases=None):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.aliases = aliases
+        # Election id (the content hash of its file and of its aliases) -> file path and ballots per variant
+        self.elections = {}
+        self.cache = {}  # (election id, kind, region, options) -> future of the count or chart
+
+    async def run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, function, *args)
+
+    def cached(self, key, function, *args):
+        """
+        Runs function in the pool once per key; concurrent and later requests share its future.
+        """
+        if key not in self.cache:
+            self.cache[key] = asyncio.ensure_future(self.run(function, *args))
+            # Failures are not cached, so that the request can be retried
+            self.cache[key].add_done_callback(lambda future: future.exception() and self.cache.pop(key, None))
+        return self.cache[key]
+
+    async def load(self, file_path, aliases=None):
+        """
+        Loads an input file, unless a file with the same content is loaded already with the same aliases.
+
+        Args:
+        file_path (str): Path to the Excel or CSV file containing voting data.
+        aliases (dict, optional): Alternative spellings of candidate names; defaults to those of the service.
+
+        Returns:
+        str: The id of the election.
+        """
+        from ballot_cache import aliases_hash, file_hash
+
+        if not os.path.isfile(file_path):
+            raise ServiceError(404, f'No such file: {file_path}')
+        if aliases is None:
+            aliases = self.aliases
+        election_id = await asyncio.get_running_loop().run_in_executor(None, file_hash, file_path)
+        if aliases:
+            # The id is part of every cache key, so ballots and results with other aliases are kept apart
+            election_id += '_' + aliases_hash(aliases)
+        if election_id not in self.elections:
+            variants = await self.cached((election_id, 'ballots'), load_election, file_path, aliases)
+            self.elections[election_id] = {'file': file_path, 'variants': variants}
+        return election_id
+
+    def options(self, query):
+        """
+        Reads and checks the counting options of a request.
+
+        Returns:
+        tuple: The invalid specifier, method, seats and elimination mode.
+        """
+        def option(name, default):
+            return query.get(name, [default])[-1]
+
+        invalid = option('invalid', 'without')
+        method = option('method', 'irv')
+        elimination = option('elimination', 'single')
+        if invalid not in ('with', 'without'):
+            raise ServiceError(400, f"Unknown invalid option '{invalid}', expected 'with' or 'without'.")
+        if method not in ('irv', 'stv', 'borda', 'schulze'):
+            raise ServiceError(400, f"Unknown method '{method}', expected 'irv', 'stv', 'borda' or 'schulze'.")
+        if elimination not in ('single', 'bulk'):
+            raise ServiceError(400, f"Unknown elimination mode '{elimination}', expected 'single' or 'bulk'.")
+        try:
+            seats = int(option('seats', '1'))
+        except ValueError:
+            raise ServiceError(400, 'seats has to be an integer.')
+        if seats < 1:
+            raise ServiceError(400, f'Invalid number of seats {seats}, expected at least 1.')
+        return f'{invalid}_invalid', method, seats, elimination
+
+    async def count(self, election_id, region, options):
+        invalid_specifier, method, seats, elimination = options
+        regions = self.elections[election_id]['variants'][invalid_specifier]
+        if region not in regions:
+            raise ServiceError(404, f'No region {region} in election {election_id}')
+        return await self.cached((election_id, 'count', region, options), count_region, regions[region], method,
+                                 seats, elimination)
+
+    async def route(self, method, target, body):
+        """
+        Answers a request.
+
+        Returns:
+        tuple: The content type and the body of the response.
+        """
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        query = parse_qs(url.query)
+
+        if parts == ['elections']:
+            if method == 'POST':
+                try:
+                    request = json.loads(body)
+                    file_path = request['file']
+                    aliases = request.get('aliases')
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    raise ServiceError(400, 'Expected a JSON body {"file": path}.')
+                if aliases is not None and not isinstance(aliases, dict):
+                    raise ServiceError(400, 'aliases has to be a JSON object mapping spellings onto names.')
+                election_id = await self.load(file_path, aliases)
+                regions = list(self.elections[election_id]['variants']['with_invalid'])
+                return 'application/json', {'id': election_id, 'file': file_path, 'regions': regions}
+            if method != 'GET':
+                raise ServiceError(405, f'{method} is not supported for /elections.')
+            return 'application/json', [{'id': election_id, 'file': election['file'],
+                                         'regions': list(election['variants']['with_invalid'])}
+                                        for election_id, election in self.elections.items()]
+
+        if method != 'GET':
+            raise ServiceError(405, f'{method} is not supported for {url.path}.')
+        if len(parts) < 3 or parts[0] != 'elections':
+            raise ServiceError(404, f'No such endpoint: {url.path}')
+        election_id = parts[1]
+        if election_id not in self.elections:
+            raise ServiceError(404, f'No election {election_id}; load it with POST /elections first.')
+        options = self.options(query)
+
+        if parts[2:] == ['results']:
+            summaries = []
+            for region in self.elections[election_id]['variants'][options[0]]:
+                result = await self.count(election_id, region, options)
+                summaries.append({'region': region, 'variant': options[0],
+                                  **{key: value for key, value in result.items() if key != 'rounds_info'}})
+            return 'application/json', summaries
+
+        if len(parts) == 5 and parts[2] == 'regions':
+            region = parts[3]
+            result = await self.count(election_id, region, options)
+            if parts[4] == 'rounds':
+                if 'rounds_info' not in result:
+                    raise ServiceError(400, f"The method '{options[1]}' has no counting rounds.")
+                rounds = result['rounds_info']
+                # Counts with Instant-Runoff Voting return a RoundResults, STV the rounds as dicts
+                return 'application/json', list(rounds.as_dicts()) if hasattr(rounds, 'as_dicts') else rounds
+            if parts[4] == 'chart.png':
+                kind = query.get('chart', ['votes'])[-1]
+                if kind not in CHART_FILES:
+                    raise ServiceError(400, f"Unknown chart '{kind}', expected 'validity', 'votes' or 'transfers'.")
+                if kind != 'validity' and options[1] != 'irv':
+                    raise ServiceError(400, f"The chart '{kind}' is only available for 'irv'.")
+                png = await self.cached((election_id, kind, region, options), chart_png, region, result, options[0],
+                                        kind)
+                return 'image/png', png
+        raise ServiceError(404, f'No such endpoint: {url.path}')
+
+    async def handle(self, reader, writer):
+        """
+        Reads one HTTP request from a connection, answers it and closes the connection.
+        """
+        try:
+            try:
+                method, target, _ = (await reader.readline()).decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode('latin-1')
+                    if line.strip() == '':
+                        break
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+            except (ValueError, asyncio.IncompleteReadError):
+                raise ServiceError(400, 'Malformed HTTP request.')
+            content_type, payload = await self.route(method, target, body)
+            status = 200
+        except ServiceError as e:
+            status, content_type, payload = e.status, 'application/json', {'error': str(e)}
+        except Exception as e:
+            status, content_type, payload = 500, 'application/json', {'error': f'{type(e).__name__}: {e}'}
+
+        if content_type == 'application/json':
+            payload = json.dumps(payload, default=to_json).encode('utf-8')
+        writer.write(f'HTTP/1.1 {status} {HTTP_REASONS[status]}\r\nContent-Type: {content_type}\r\n'
+                     f'Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, files=()):
+        """
+        Loads the given files and answers requests until cancelled. Files that cannot be loaded are
+        reported and skipped.
+
+        Args:
+        host (str): The address to listen on; the default only accepts local connections.
+        port (int): The port to listen on.
+        files (iterable of str): Input files to load before the first request.
+        """
+        for file_path in files:
+            try:
+                print(f'{file_path}: loaded as {await self.load(file_path)}')
+            except Exception as e:
+                print(f'{file_path}: failed to load ({e})')
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f'Serving results on http://{host}:{port}/elections')
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    from candidate_registry import load_aliases
+
+    parser = argparse.ArgumentParser(description='Serve election results from ballots kept in memory.')
+    parser.add_argument('files', nargs='*', help='input files to load at startup')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='port to listen on')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--aliases', metavar='JSON_FILE',
+                        help='JSON object mapping alternative spellings of candidate names onto their canonical name')
+    args = parser.parse_args()
+
+    service = ResultsService(args.workers, load_aliases(args.aliases))
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.files))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.pool.shutdown(cancel_futures=True)
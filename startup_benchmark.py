@@ -0,0 +1,63 @@
+import argparse
+import subprocess
+import sys
+import time
+
+# Code each entry point has to run before its window can be shown
+STARTUP_CASES = {
+    'import evaluation': 'import evaluation',
+    'tkinter window': 'import tkinter as tk\n'
+                      'from tkinter import filedialog, messagebox, ttk\n'
+                      'import evaluation\n'
+                      'root = tk.Tk()\n'
+                      'root.update()\n'
+                      'root.destroy()',
+    'PyQt window': 'import sys\n'
+                   'from PyQt5.QtWidgets import QApplication, QMainWindow\n'
+                   'import evaluation\n'
+                   'app = QApplication(sys.argv)\n'
+                   'window = QMainWindow()\n'
+                   'window.show()\n'
+                   'app.processEvents()',
+}
+
+
+def time_startup(code, repeats=5):
+    """
+    Measures the wall time of running code in a fresh Python interpreter, including interpreter startup.
+
+    Args:
+    code (str): The Python code to run.
+    repeats (int): Number of runs; the fastest one is reported to reduce noise.
+
+    Returns:
+    float: The fastest wall time in milliseconds, or None if the code cannot run here
+           (e.g. no display or GUI toolkit available).
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True)
+        if result.returncode != 0:
+            return None
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check that the GUIs start within the time budget.')
+    parser.add_argument('--target-ms', type=float, default=300, help='startup budget in milliseconds')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    too_slow = False
+    for name, code in STARTUP_CASES.items():
+        timing = time_startup(code, args.repeats)
+        if timing is None:
+            print(f'{name:20s} skipped (not available in this environment)')
+            continue
+        status = 'ok' if timing <= args.target_ms else 'TOO SLOW'
+        too_slow |= timing > args.target_ms
+        print(f'{name:20s} {timing:7.1f} ms  {status}')
+
+    sys.exit(1 if too_slow else 0)
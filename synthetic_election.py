@@ -0,0 +1,130 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+# Made-up candidate names; the list is repeated with a number if more candidates are needed
+CANDIDATE_NAMES = ['Amina Diallo', 'Ben Carter', 'Chen Wei', 'Daniela Souza', 'Emeka Obi', 'Farah Haddad',
+                   'Gustavo Lima', 'Hana Sato', 'Ivan Petrov', 'Julia Novak', 'Kofi Mensah', 'Leila Karimi']
+
+
+def option_letter(i):
+    """
+    Returns the ballot option letter of the i-th option: A to Z, then AA, AB, ...
+    """
+    letters = ''
+    i += 1
+    while i > 0:
+        i, remainder = divmod(i - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def generate_ballots(n_voters, n_candidates, question, truncation_rate=0.3, no_good_rate=0.05, empty_rate=0.02,
+                     rng=None):
+    """
+    Generates the ballot strings of one region in the format of the voting platform export, e.g.
+    'Question No. 1 [A] Amina Diallo > [C] Chen Wei > [E] No good Candidate'.
+
+    Rankings are drawn from a Plackett-Luce model with random candidate popularities, so that some
+    candidates are clearly preferred and many ballots repeat the same ranking, like in real elections.
+
+    Args:
+    n_voters (int): Number of ballots.
+    n_candidates (int): Number of candidates, not counting the 'No good Candidate' option.
+    question (int): Question number used as prefix of the ballot strings.
+    truncation_rate (float): Share of ballots that only rank some of the candidates.
+    no_good_rate (float): Share of ballots that rank 'No good Candidate', which ends the ranking.
+    empty_rate (float): Share of voters that left the question empty.
+    rng (np.random.Generator, optional): The random number generator.
+
+    Returns:
+    np.ndarray: The ballot strings (None for empty ballots).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    names = [CANDIDATE_NAMES[i % len(CANDIDATE_NAMES)] + (f' {i // len(CANDIDATE_NAMES) + 1}' if i >= len(CANDIDATE_NAMES) else '')
+             for i in range(n_candidates)]
+    options = np.array([f'[{option_letter(i)}] {name}' for i, name in enumerate(names)]
+                       + [f'[{option_letter(n_candidates)}] No good Candidate'], dtype=object)
+
+    # Plackett-Luce rankings: sort by log-popularity plus Gumbel noise
+    popularity = np.log(rng.dirichlet(np.ones(n_candidates)))
+    rankings = np.argsort(-(popularity + rng.gumbel(size=(n_voters, n_candidates))), axis=1)
+
+    # Truncate some ballots and let some end with 'No good Candidate' (possibly as their first choice)
+    lengths = np.full(n_voters, n_candidates)
+    truncated = rng.random(n_voters) < truncation_rate
+    lengths[truncated] = rng.integers(1, n_candidates + 1, truncated.sum())
+    no_good = rng.random(n_voters) < no_good_rate
+    no_good_position = rng.integers(0, lengths + 1)
+    rankings = np.concatenate([rankings, np.full((n_voters, 1), n_candidates)], axis=1)
+    rankings[no_good, no_good_position[no_good]] = n_candidates
+    lengths[no_good] = no_good_position[no_good] + 1
+
+    ballots = np.empty(n_voters, dtype=object)
+    prefix = f'Question No. {question} '
+    for i in range(n_voters):
+        ballots[i] = prefix + ' > '.join(options[rankings[i, :lengths[i]]])
+    ballots[rng.random(n_voters) < empty_rate] = None
+    return ballots
+
+
+def generate_election(n_voters, n_candidates=(8, 10), truncation_rate=0.3, no_good_rate=0.05, empty_rate=0.02,
+                      merged_rate=0.1, seed=0):
+    """
+    Generates a synthetic election with the columns 'Voter-ID', 'Region 1' and 'Region 2'.
+
+    Args:
+    n_voters (int): Number of voters.
+    n_candidates (tuple of ints): Number of candidates in region 1 and region 2.
+    truncation_rate (float): Share of ballots that only rank some of the candidates.
+    no_good_rate (float): Share of ballots that rank 'No good Candidate'.
+    empty_rate (float): Share of voters that left a question empty.
+    merged_rate (float): Share of rows whose Voter-ID cell is empty, as for merged cells in the export.
+    seed (int): Seed for reproducible elections.
+
+    Returns:
+    df: The election without a header row, like the workbooks read by input_excel.
+    """
+    rng = np.random.default_rng(seed)
+    voter_ids = rng.choice(np.arange(100000, 100000 + 10 * max(n_voters, 1)), n_voters, replace=False)
+    voter_ids = voter_ids.astype(object)
+    merged = rng.random(n_voters) < merged_rate
+    merged[:1] = False
+    voter_ids[merged] = None
+
+    return pd.DataFrame({
+        0: voter_ids,
+        1: generate_ballots(n_voters, n_candidates[0], 1, truncation_rate, no_good_rate, empty_rate, rng),
+        2: generate_ballots(n_voters, n_candidates[1], 2, truncation_rate, no_good_rate, empty_rate, rng),
+    })
+
+
+def write_election(df, path):
+    """
+    Writes a synthetic election as an Excel (.xlsx) or CSV (.csv) file without a header row.
+
+    Args:
+    df (pd.DataFrame): The election as returned by generate_election.
+    path (str): The file path.
+    """
+    if path.lower().endswith('.csv'):
+        df.to_csv(path, header=False, index=False)
+    else:
+        df.to_excel(path, header=False, index=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic election workbook.')
+    parser.add_argument('path', help='output file (.xlsx or .csv)')
+    parser.add_argument('--voters', type=int, default=1000)
+    parser.add_argument('--candidates', type=int, nargs=2, default=[8, 10], metavar=('REGION1', 'REGION2'))
+    parser.add_argument('--truncation-rate', type=float, default=0.3)
+    parser.add_argument('--no-good-rate', type=float, default=0.05)
+    parser.add_argument('--empty-rate', type=float, default=0.02)
+    parser.add_argument('--merged-rate', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    election = generate_election(args.voters, tuple(args.candidates), args.truncation_rate, args.no_good_rate,
+                                 args.empty_rate, args.merged_rate, args.seed)
+    write_election(election, args.path)
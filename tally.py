@@ -0,0 +1,173 @@
+import numpy as np
+from helper_functions import current_top_choices
+
+
+class FullTally:
+    """
+    Counts the current top choice of every ballot from scratch in each round.
+
+    The ballots can be distinct patterns with weights (see ballot_patterns), in which case every
+    pattern counts as often as it was cast.
+
+    Attributes:
+    counts (np.ndarray): Number of ballots currently counting for each candidate ID.
+    first_seen (np.ndarray): Lowest ballot index currently counting for each candidate ID,
+                             used to order tied candidates like value_counts().
+    """
+
+    def __init__(self, ballots, n_candidates, weights=None):
+        self.ballots = ballots
+        self.weights = weights
+        self.eliminated = np.zeros(n_candidates, dtype=bool)
+        self.recount()
+
+    def recount(self):
+        _, top = current_top_choices(self.ballots, self.eliminated)
+        counted = np.flatnonzero(top >= 0)
+        weights = self.weights[counted] if self.weights is not None else None
+        self.counts = np.bincount(top[counted], weights, minlength=len(self.eliminated)).astype(np.int64)
+
+        self.first_seen = np.full(len(self.eliminated), len(self.ballots))
+        present, first_index = np.unique(top[counted], return_index=True)
+        self.first_seen[present] = counted[first_index]
+
+    def eliminate(self, candidate):
+        """
+        Eliminates one or more candidates and recounts the ballots.
+
+        Args:
+        candidate (int or np.ndarray): ID(s) of the candidate(s) to eliminate.
+
+        Returns:
+        int: The number of the candidates' ballots that ranked no remaining candidate (exhausted). Their
+             transfers follow from the counts of the next round, see RoundResults.transfers.
+        """
+        counted = self.counts.sum()
+        self.eliminated[candidate] = True
+        self.recount()
+        # Only the candidates' ballots move, so the ballots no longer counted are exhausted
+        return int(counted - self.counts.sum())
+
+
+class IncrementalTally:
+    """
+    Keeps a bucket of ballot indices per candidate and a pointer per ballot to its current
+    preference level. Eliminating a candidate only re-routes the ballots in that candidate's
+    bucket and updates the counts by the resulting deltas, so the total work scales with the
+    number of transfers rather than with rounds x voters.
+
+    The ballots can be distinct patterns with weights (see ballot_patterns), in which case every
+    pattern counts as often as it was cast.
+
+    Attributes:
+    counts (np.ndarray): Number of ballots currently counting for each candidate ID.
+    first_seen (np.ndarray): Lowest ballot index currently counting for each candidate ID,
+                             used to order tied candidates like value_counts().
+    """
+
+    def __init__(self, ballots, n_candidates, weights=None):
+        self.ballots = ballots
+        self.weights = weights
+        self.eliminated = np.zeros(n_candidates, dtype=bool)
+        self.position, self.top = current_top_choices(ballots, self.eliminated)
+
+        self.buckets = [[] for _ in range(n_candidates)]
+        self.counts = np.zeros(n_candidates, dtype=np.int64)
+        self.first_seen = np.full(n_candidates, len(ballots))
+        self.route(np.arange(len(ballots)))
+
+    def route(self, rows):
+        """
+        Adds ballots to the buckets of their current top choice and updates the counts.
+
+        Args:
+        rows (np.ndarray): Indices of the ballots to add.
+        """
+        top = self.top[rows]
+        rows = rows[top >= 0]
+        top = top[top >= 0]
+
+        weights = self.weights[rows] if self.weights is not None else None
+        self.counts += np.bincount(top, weights, minlength=len(self.counts)).astype(np.int64)
+        np.minimum.at(self.first_seen, top, rows)
+
+        # Group the rows by their new top choice and append each group to its bucket
+        order = np.argsort(top, kind='stable')
+        bounds = np.searchsorted(top[order], np.arange(len(self.counts) + 1))
+        for candidate in np.flatnonzero(np.diff(bounds)):
+            self.buckets[candidate].append(rows[order[bounds[candidate]:bounds[candidate + 1]]])
+
+    def eliminate(self, candidate):
+        """
+        Eliminates one or more candidates and re-routes only the ballots in their buckets.
+
+        Args:
+        candidate (int or np.ndarray): ID(s) of the candidate(s) to eliminate.
+
+        Returns:
+        int: The number of the candidates' ballots that ranked no remaining candidate (exhausted). Their
+             transfers follow from the counts of the next round, see RoundResults.transfers.
+        """
+        counted = self.counts.sum()
+        self.eliminated[candidate] = True
+        moved = []
+        for c in np.atleast_1d(candidate):
+            moved.extend(self.buckets[c])
+            self.buckets[c] = []
+        moved = np.concatenate(moved) if moved else np.array([], dtype=int)
+        self.counts[candidate] = 0
+
+        # Advance only the pointers of the moved ballots past their current preference level
+        position, top = current_top_choices(self.ballots[moved], self.eliminated, start=self.position[moved] + 1)
+        self.position[moved] = position
+        self.top[moved] = top
+        self.route(moved)
+        return int(counted - self.counts.sum())
+
+
+class BatchTally:
+    """
+    Tallies many weightings of the same ballots at once, e.g. bootstrap resamples. The ballots are
+    given as distinct patterns and each replicate is a row of pattern weights, so every round is a
+    few array operations over all replicates instead of a loop over replicates.
+
+    Each replicate has its own elimination mask; eliminating candidate -1 leaves a replicate unchanged.
+
+    Attributes:
+    counts (np.ndarray): Weighted number of ballots currently counting for each replicate and candidate ID.
+    first_seen (np.ndarray): Lowest pattern index with a positive weight currently counting for each
+                             replicate and candidate ID, used to order tied candidates like value_counts().
+    """
+
+    def __init__(self, patterns, weights, n_candidates):
+        self.patterns = patterns
+        self.weights = np.asarray(weights)
+        self.eliminated = np.zeros((len(self.weights), n_candidates), dtype=bool)
+        self.recount()
+
+    def recount(self):
+        n_replicates, n_candidates = self.eliminated.shape
+        n_patterns = len(self.patterns)
+
+        # Top choice of every pattern under the elimination mask of every replicate
+        skip = np.concatenate([self.eliminated, np.ones((n_replicates, 1), dtype=bool)], axis=1)
+        remaining = ~skip[:, self.patterns]
+        position = remaining.argmax(axis=2)
+        top = self.patterns[np.arange(n_patterns), position]
+        top[~remaining.any(axis=2)] = -1
+
+        # Offset the candidate IDs per replicate so that one bincount covers all replicates
+        counted = (top >= 0) & (self.weights > 0)
+        replicate, pattern = np.nonzero(counted)
+        slots = replicate * n_candidates + top[replicate, pattern]
+        self.counts = np.bincount(slots, weights=self.weights[replicate, pattern],
+                                  minlength=n_replicates * n_candidates).reshape(n_replicates, n_candidates)
+
+        self.first_seen = np.full(n_replicates * n_candidates, n_patterns)
+        np.minimum.at(self.first_seen, slots, pattern)
+        self.first_seen = self.first_seen.reshape(n_replicates, n_candidates)
+
+    def eliminate(self, candidates):
+        replicates = np.flatnonzero(candidates >= 0)
+        self.eliminated[replicates, candidates[replicates]] = True
+        self.recount()
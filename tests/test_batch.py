@@ -0,0 +1,29 @@
+import os
+import pytest
+from batch import find_inputs, run_batch
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'w').close()
+
+
+def test_directories_are_searched_recursively(tmp_path):
+    for name in ('GN.xlsx', '2023/GN.csv', '2023/regions/GN.xlsx', '2023/~$GN.xlsx', '2023/notes.txt',
+                 'batch_outputs/GN.xlsx/results_with_invalid.xlsx'):
+        touch(str(tmp_path / name))
+
+    files = find_inputs([str(tmp_path)], exclude=[str(tmp_path / 'batch_outputs')])
+    assert [os.path.relpath(path, tmp_path).replace(os.sep, '/') for path in files] == [
+        '2023/GN.csv', '2023/regions/GN.xlsx', 'GN.xlsx']
+
+    pattern = os.path.join(str(tmp_path), '**', '*.xlsx')
+    assert len(find_inputs([pattern], exclude=[str(tmp_path / 'batch_outputs')])) == 2
+
+
+def test_no_matching_inputs_fail_the_batch(tmp_path, capsys):
+    touch(str(tmp_path / 'inputs' / 'notes.txt'))
+    with pytest.raises(ValueError, match='No input files'):
+        run_batch([str(tmp_path / 'inputs'), str(tmp_path / 'missing' / '*.xlsx')], str(tmp_path / 'outputs'))
+    assert 'no input files found' in capsys.readouterr().out
+    assert not os.path.exists(tmp_path / 'outputs')
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ballot_encoder import BallotEncoder
+from candidate_registry import CandidateRegistry, candidate_key
+from evaluation import clean_up_dataframe
+from synthetic_election import generate_election
+
+
+def test_multi_letter_prefixes_are_removed():
+    registry = CandidateRegistry()
+    assert registry.register('[AA] Jane Doe') == registry.register('[B] Jane Doe') == registry.register('Jane Doe')
+    assert registry.register('[AB]John Roe') == registry.register('  [ZZ]   John Roe ')
+    assert registry.names == ['Jane Doe', 'John Roe']
+    assert candidate_key('[AA]  Jane   Doe ') == 'jane doe'
+
+
+def test_case_and_whitespace_variants_share_an_id():
+    registry = CandidateRegistry()
+    ids = registry.encode(['[A] Jane Doe', '[A] jane doe', '[A]  JANE   Doe ', '[A] Jane\tDoe'])
+    assert ids.tolist() == [0, 0, 0, 0]
+    assert registry.names == ['Jane Doe']
+    assert len(registry.spellings) == 4
+
+
+def test_alias_target_appearing_later_keeps_the_alias_id():
+    registry = CandidateRegistry({'Jon Doe': '[C] John  Doe'})
+    alias = registry.register('[C] jon doe')
+    other = registry.register('[A] Jane Doe')
+    assert registry.register('[B] John Doe') == alias != other
+    assert registry.names == ['John Doe', 'Jane Doe']
+
+
+def test_no_good_candidate_stays_lowercase():
+    registry = CandidateRegistry({'None of them': 'No Good Candidate'})
+    ids = registry.encode(['[Z] No Good Candidate', '[Z] NO GOOD CANDIDATE', 'None of them', '[A] Jane Doe'])
+    assert ids.tolist() == [0, 0, 0, 1]
+    assert registry.names == ['no good candidate', 'Jane Doe']
+    assert registry.no_good().tolist() == [True, False]
+
+
+def encode(raw_votes, aliases=None):
+    """
+    Encodes the raw ballots of one region and returns the result of finish for both invalid-vote variants.
+    """
+    encoder = BallotEncoder(aliases)
+    encoder.add(raw_votes)
+    return {consider_invalid: encoder.finish(consider_invalid) for consider_invalid in (True, False)}
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_spelling_aliases_do_not_change_the_counts(seed):
+    raw_votes = generate_election(300, n_candidates=(4, 6), truncation_rate=0.3, no_good_rate=0.1, seed=seed).iloc[:, 1]
+    # Aliases from differently spelled ballots onto the names they already have are a no-op
+    respelled = raw_votes.astype(object).str.upper()
+    names = encode(raw_votes)[True][1]
+    aliases = {name.upper(): name for name in names}
+
+    expected = encode(raw_votes)
+    for variant, result in encode(respelled, aliases).items():
+        ballots, candidates, *counts, weights, _, _ = result
+        assert candidates == expected[variant][1]
+        assert counts == list(expected[variant][2:5])
+        np.testing.assert_array_equal(ballots, expected[variant][0])
+        np.testing.assert_array_equal(weights, expected[variant][5])
+
+
+def test_merging_aliases_keep_the_vote_totals():
+    raw_votes = pd.Series(['[A] Jane Doe > [B] Jon Doe > [C] John Doe',
+                           '[B] John Doe > [A] Jane Doe > [C] Jon Doe',
+                           '[A] Jane Doe',
+                           None,
+                           '[C] no good candidate'])
+    plain = encode(raw_votes)[True]
+    merged = encode(raw_votes, {'Jon Doe': 'John Doe'})[True]
+
+    assert plain[1] == ['Jane Doe', 'Jon Doe', 'John Doe', 'no good candidate']
+    assert merged[1] == ['Jane Doe', 'John Doe', 'no good candidate']
+    # Total votes, 'no good candidate' votes and counted ballots are the same, only the names differ
+    assert plain[2:4] == merged[2:4] == (5, 2)
+    assert plain[5].sum() == merged[5].sum() == 3
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_missing_candidates_match_the_row_wise_cleaning(seed):
+    input_df = generate_election(300, n_candidates=(4, 6), truncation_rate=0.5, no_good_rate=0.1, seed=seed)
+    input_df.columns = ['Voter-ID', 'Region 1', 'Region 2']
+    for region in ('Region 1', 'Region 2'):
+        *_, invalid_votes, expected = clean_up_dataframe(input_df[['Voter-ID', region]].copy(), return_missing=True)
+        _, candidates, _, _, counted_invalid, _, missing, weights = encode(input_df[region])[False]
+
+        assert counted_invalid == invalid_votes == weights.sum()
+        # Ballots missing each candidate, counted over the distinct invalid votes
+        assert dict(zip(candidates, (weights @ missing).tolist())) == {
+            name: int(expected[name].sum()) if name in expected else 0 for name in candidates}
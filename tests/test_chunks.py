@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from evaluation import encode_input_chunks, read_input_chunks
+from synthetic_election import generate_election
+
+CHUNK_SIZES = [7, 333, 5000]
+
+
+@pytest.fixture(scope='module', params=['xlsx', 'csv'])
+def input_file(request, tmp_path_factory):
+    """
+    Writes a synthetic election whose Voter-ID cells are often merged, with more rows than the largest chunk size.
+    """
+    input_df = generate_election(6000, n_candidates=(4, 6), truncation_rate=0.3, no_good_rate=0.1, merged_rate=0.3,
+                                 seed=1)
+    file_path = str(tmp_path_factory.mktemp('chunks') / f'election.{request.param}')
+    if request.param == 'csv':
+        input_df.to_csv(file_path, header=False, index=False)
+    else:
+        input_df.to_excel(file_path, header=False, index=False)
+    return file_path
+
+
+def single_read(file_path):
+    """
+    Reads the whole file at once and fills the merged Voter-ID cells.
+    """
+    if file_path.endswith('.csv'):
+        input_df = pd.read_csv(file_path, header=None)
+    else:
+        input_df = pd.read_excel(file_path, header=None)
+    input_df.columns = ['Voter-ID', 'Region 1', 'Region 2']
+    input_df['Voter-ID'] = input_df['Voter-ID'].ffill()
+    return input_df
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_chunks_match_a_single_read(input_file, chunk_size):
+    chunks = list(read_input_chunks(input_file, chunk_size))
+    assert max(len(chunk) for chunk in chunks) <= chunk_size
+    chunked = pd.concat(chunks)
+
+    expected = single_read(input_file)
+    assert chunked['Voter-ID'].notna().all()
+    # Filled cells keep the Voter-ID as read, which may be an int or a float depending on the chunk
+    pd.testing.assert_frame_equal(chunked, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_chunked_encoding_matches_a_single_read(input_file, chunk_size):
+    expected = encode_input_chunks(input_file, len(single_read(input_file)))
+    encoders = encode_input_chunks(input_file, chunk_size)
+    assert list(encoders) == list(expected)
+
+    for region, encoder in encoders.items():
+        for consider_invalid in (True, False):
+            result = encoder.finish(consider_invalid)
+            reference = expected[region].finish(consider_invalid)
+            assert result[1:5] == reference[1:5]
+            for array, expected_array in zip(result[:1] + result[5:], reference[:1] + reference[5:]):
+                np.testing.assert_array_equal(array, expected_array)
@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from ballot_encoder import BallotEncoder
+from candidate_registry import is_no_good
+from evaluation import evaluate_region, load_region_ballots, run_instant_runoff
+from methods import borda_count, schulze_method, single_transferable_vote
+from synthetic_election import generate_ballots
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Elections_2023.xlsx')
+
+
+def sample_regions():
+    return [ballots for ballots in load_region_ballots(SAMPLE_FILE, consider_invalid=True).values()]
+
+
+def synthetic_regions():
+    regions = []
+    for seed, n_candidates in enumerate([2, 3, 6]):
+        encoder = BallotEncoder()
+        rng = np.random.default_rng(seed)
+        encoder.add(pd.Series(generate_ballots(500, n_candidates, 1, no_good_rate=0.4, rng=rng)))
+        regions.append(encoder.finish(consider_invalid=True))
+    return regions
+
+
+@pytest.mark.parametrize('region_ballots', sample_regions() + synthetic_regions())
+def test_no_good_candidate_is_never_counted(region_ballots):
+    ballots, candidates, _, _, _, weights, _, _ = region_ballots
+    counted = [name for name in candidates if not is_no_good(name)]
+
+    # More seats than candidates, so every remaining candidate is elected
+    elected, rounds_info, _ = single_transferable_vote(ballots, candidates, len(candidates) + 1, weights)
+    assert sorted(elected) == sorted(counted)
+    assert not any(is_no_good(name) for round in rounds_info for name in round['Votes'])
+
+    winner, scores = borda_count(ballots, candidates, weights)
+    assert not is_no_good(winner)
+    assert sorted(scores) == sorted(counted)
+
+    winner, ranking, preferences, paths = schulze_method(ballots, candidates, weights)
+    assert not is_no_good(winner)
+    assert sorted(ranking) == sorted(counted)
+    assert preferences.shape == paths.shape == (len(counted), len(counted))
+
+
+@pytest.mark.parametrize('region_ballots', sample_regions() + synthetic_regions())
+def test_borda_table_is_ordered_by_score(region_ballots, tmp_path):
+    _, summary = evaluate_region('Region', region_ballots, str(tmp_path), 'with_invalid', render=False,
+                                 method='borda', export='workbook')
+    scores = summary['tables']['Region borda']['Borda score']
+    assert scores.is_monotonic_decreasing
+    assert summary['winner'] == (scores.index[0] if len(scores) else "No winner found")
+
+
+@pytest.mark.parametrize('seats', [0, -1])
+def test_stv_needs_a_seat(seats, tmp_path):
+    ballots, candidates, *_, weights, _, _ = synthetic_regions()[0]
+    with pytest.raises(ValueError, match='seats'):
+        single_transferable_vote(ballots, candidates, seats, weights)
+    with pytest.raises(ValueError, match='seats'):
+        run_instant_runoff(SAMPLE_FILE, str(tmp_path), method='stv', seats=seats, plots='none')
@@ -0,0 +1,49 @@
+import os
+import shutil
+import threading
+import pytest
+from evaluation import EvaluationCancelled, InputPreview, input_excel, run_instant_runoff
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Elections_2023.xlsx')
+
+
+def test_pages_are_only_stringified_when_displayed():
+    preview = InputPreview(SAMPLE_FILE, page_size=100)
+    assert preview.row_count == 100
+    assert preview.rows(98, 102) == preview.rows(98, 100)
+
+    df = preview.frame()
+    assert len(df) == preview.row_count == len(input_excel(SAMPLE_FILE))
+    assert preview.page_cells[1:] == [None] * (len(preview.pages) - 1)
+    assert preview.rows(99, 101)[1] == preview.pages[1].iloc[0].astype(str).tolist()
+    assert preview.cell(150, 1) == df.iloc[150, 1]
+
+
+def test_changed_file_is_read_again(tmp_path):
+    file_path = str(tmp_path / 'election.xlsx')
+    shutil.copy(SAMPLE_FILE, file_path)
+    preview = InputPreview(file_path, page_size=100)
+    assert preview.is_current()
+
+    # The evaluation of a stale preview would take the rows of the earlier file
+    input_excel(file_path).iloc[:200].to_excel(file_path, header=False, index=False)
+    assert not preview.is_current()
+    summaries = run_instant_runoff(file_path, str(tmp_path), True, plots='none', preview=preview)
+    assert preview.row_count == 100
+    assert max(summary['valid votes'] + summary['no good candidates'] for summary in summaries) == 200
+
+
+def test_reading_the_preview_can_be_cancelled(tmp_path):
+    preview = InputPreview(SAMPLE_FILE, page_size=100)
+    cancel_event = threading.Event()
+    events = []
+
+    def progress(phase, message, seconds, fraction):
+        events.append(phase)
+        cancel_event.set()
+
+    with pytest.raises(EvaluationCancelled):
+        run_instant_runoff(SAMPLE_FILE, str(tmp_path), True, plots='none', progress=progress,
+                           cancel_event=cancel_event, preview=preview)
+    assert events == ['parse']
+    assert not preview.complete
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import pandas as pd
+import pytest
+from service import ResultsService
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Elections_2023.xlsx')
+
+
+async def request(port, method, target, body=None):
+    """
+    Sends one HTTP request to the service and returns the status and the body of the response.
+    """
+    body = json.dumps(body).encode('utf-8') if body is not None else b''
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'{method} {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+    await writer.drain()
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+    length = int(head.lower().split('content-length:')[1].split()[0])
+    payload = await reader.readexactly(length)
+    writer.close()
+    return int(head.split()[1]), payload
+
+
+def serve(scenario):
+    """
+    Starts a service on a free port and runs scenario(port) against it.
+    """
+    async def main():
+        service = ResultsService(workers=1)
+        server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        try:
+            return await scenario(server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+            service.pool.shutdown(cancel_futures=True)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('extension', ['xlsx', 'csv'])
+def test_every_listed_region_is_served(extension, tmp_path):
+    # The sample workbook has four columns, so its regions are numbered instead of named
+    input_path = SAMPLE_FILE
+    if extension == 'csv':
+        input_path = str(tmp_path / 'election.csv')
+        pd.read_excel(SAMPLE_FILE, header=None).to_csv(input_path, header=False, index=False)
+
+    async def scenario(port):
+        status, body = await request(port, 'POST', '/elections', {'file': input_path})
+        assert status == 200
+        election = json.loads(body)
+        assert election['regions'] == ['1', '2', '3']
+
+        status, body = await request(port, 'GET', f"/elections/{election['id']}/results")
+        assert status == 200
+        assert [result['region'] for result in json.loads(body)] == election['regions']
+
+        for region in election['regions']:
+            status, body = await request(port, 'GET', f"/elections/{election['id']}/regions/{region}/rounds")
+            assert status == 200
+            assert isinstance(json.loads(body), list)
+
+        status, body = await request(port, 'GET', f"/elections/{election['id']}/regions/2/chart.png?chart=validity")
+        assert status == 200
+        assert body.startswith(b'\x89PNG')
+
+        status, _ = await request(port, 'GET', f"/elections/{election['id']}/regions/4/rounds")
+        assert status == 404
+
+        status, _ = await request(port, 'GET', f"/elections/{election['id']}/results?method=stv&seats=0")
+        assert status == 400
+
+    serve(scenario)
+
+
+def test_aliases_are_part_of_the_election(tmp_path):
+    async def scenario(port):
+        _, body = await request(port, 'POST', '/elections', {'file': SAMPLE_FILE})
+        plain = json.loads(body)
+        _, body = await request(port, 'POST', '/elections',
+                                {'file': SAMPLE_FILE, 'aliases': {'Romie Niedermayer': 'Ben Santhouse-James'}})
+        merged = json.loads(body)
+        assert merged['id'] != plain['id']
+
+        _, body = await request(port, 'GET', f"/elections/{plain['id']}/regions/1/rounds")
+        assert 'Romie Niedermayer' in json.loads(body)[0]['Votes']
+        _, body = await request(port, 'GET', f"/elections/{merged['id']}/regions/1/rounds")
+        assert 'Romie Niedermayer' not in json.loads(body)[0]['Votes']
+
+        status, _ = await request(port, 'POST', '/elections', {'file': SAMPLE_FILE, 'aliases': ['Romie']})
+        assert status == 400
+
+    serve(scenario)
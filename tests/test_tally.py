@@ -0,0 +1,116 @@
+import functools
+import os
+import pandas as pd
+import pytest
+from evaluation import clean_up_dataframe, input_excel, instant_runoff_tally, instant_runoff_voting
+from helper_functions import encode_ballots, shift_choices
+from synthetic_election import generate_election
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Elections_2023.xlsx')
+
+# (source, region, consider_invalid) of every election the tallies are compared on
+SAMPLE_ELECTIONS = [('sample', region, consider_invalid) for region in ('Region 1', 'Region 2')
+                    for consider_invalid in (True, False)]
+RANDOM_ELECTIONS = [(seed, region, consider_invalid) for seed in range(4) for region in ('Region 1', 'Region 2')
+                    for consider_invalid in (True, False)]
+
+
+@functools.lru_cache(maxsize=None)
+def clean_votes(source, region, consider_invalid):
+    """
+    Returns the cleaned ballots of a region of the sample file, or of a seeded synthetic election.
+    """
+    if source == 'sample':
+        input_df = input_excel(SAMPLE_FILE).iloc[:, :3]
+    else:
+        input_df = generate_election(300, n_candidates=(4, 7), truncation_rate=0.5, no_good_rate=0.1, seed=source)
+    input_df.columns = ['Voter-ID', 'Region 1', 'Region 2']
+    return clean_up_dataframe(input_df[['Voter-ID', region]].copy(), consider_invalid)[0]
+
+
+@functools.lru_cache(maxsize=None)
+def baseline_rounds(source, region, consider_invalid):
+    """
+    The row-wise count of the original instant_runoff_voting: each round counts the first column and
+    shifts the choices of every ballot after removing the eliminated candidate. The 'NaN' filler of
+    shift_choices marks an exhausted ballot, and ties for the fewest votes go to the candidate that appears
+    first in the first column, like value_counts().idxmin().
+
+    Returns:
+    tuple: The winner and a list with the votes and the eliminated candidates of each round.
+    """
+    votes_df = clean_votes(source, region, consider_invalid).iloc[:, 2:]
+    rounds = []
+    while votes_df.shape[1]:
+        first_choices = votes_df.iloc[:, 0]
+        first_choices = first_choices[first_choices.notna() & (first_choices != 'NaN')]
+        if len(first_choices) == 0:
+            break
+        counts = first_choices.value_counts()[pd.unique(first_choices)]
+        rounds.append({'Votes': counts.to_dict(), 'Eliminated': set()})
+        if counts.max() / counts.sum() > 0.5:
+            return counts.idxmax(), rounds
+
+        least_votes_candidate = counts.idxmin()
+        rounds[-1]['Eliminated'] = {least_votes_candidate}
+        votes_df = votes_df.apply(lambda row: shift_choices(row, least_votes_candidate), axis=1, result_type='expand')
+    return "No winner found", rounds
+
+
+def tally_rounds(source, region, consider_invalid, tally, elimination, weighted):
+    """
+    Counts an election with instant_runoff_tally, on the distinct ballots with weights or on every ballot.
+
+    Returns:
+    tuple: The winner and a list with the votes and the eliminated candidates of each round.
+    """
+    votes = clean_votes(source, region, consider_invalid)
+    if weighted:
+        winner, rounds, _ = instant_runoff_voting(votes, tally, elimination)
+    else:
+        ballots, candidates = encode_ballots(votes.iloc[:, 2:])
+        winner, rounds, _ = instant_runoff_tally(ballots, candidates, tally, elimination=elimination)
+    return winner, [{'Votes': round['Votes'], 'Eliminated': set(round['Eliminated candidates'])}
+                    for round in rounds.as_dicts()]
+
+
+def eliminated_before(rounds):
+    """
+    Returns the candidates eliminated before each round, which identifies the state of the count.
+    """
+    eliminated = set()
+    states = []
+    for round in rounds:
+        states.append(frozenset(eliminated))
+        eliminated |= round['Eliminated']
+    return states
+
+
+@pytest.mark.parametrize('tally', ['full', 'incremental'])
+@pytest.mark.parametrize('weighted', [True, False], ids=['patterns', 'ballots'])
+@pytest.mark.parametrize('election', SAMPLE_ELECTIONS + RANDOM_ELECTIONS, ids=str)
+def test_single_elimination_matches_baseline(election, tally, weighted):
+    expected_winner, expected = baseline_rounds(*election)
+    winner, rounds = tally_rounds(*election, tally, 'single', weighted)
+
+    # The votes are compared as dicts, so candidates with the same number of votes may be listed in any order
+    assert winner == expected_winner
+    assert rounds == expected
+
+
+@pytest.mark.parametrize('tally', ['full', 'incremental'])
+@pytest.mark.parametrize('weighted', [True, False], ids=['patterns', 'ballots'])
+@pytest.mark.parametrize('election', SAMPLE_ELECTIONS + RANDOM_ELECTIONS, ids=str)
+def test_bulk_elimination_matches_baseline(election, tally, weighted):
+    expected_winner, expected = baseline_rounds(*election)
+    winner, rounds = tally_rounds(*election, tally, 'bulk', weighted)
+    assert winner == expected_winner
+
+    # Every bulk round has the votes of the sequential round after the same eliminations. Only the final
+    # round may be missing there, if the sequential count reached a majority halfway through a group.
+    expected_votes = dict(zip(eliminated_before(expected), [round['Votes'] for round in expected]))
+    states = eliminated_before(rounds)
+    for i, (state, round) in enumerate(zip(states, rounds)):
+        if i < len(rounds) - 1 or state in expected_votes:
+            assert round['Votes'] == expected_votes[state]
+    assert len(rounds) <= len(expected)